@@ -0,0 +1,50 @@
+"""
+Shared setup for the benchmark scripts.
+Benchmarks run against a throwaway test database, never against db.sqlite3.
+"""
+import os
+import sys
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'university_project.settings')
+
+import django
+
+django.setup()
+
+
+@contextmanager
+def benchmark_database(path=None):
+    """
+    Create a throwaway test database for the duration of a benchmark.
+    SQLite test databases live in memory unless `path` names a file, which
+    multi-threaded benchmarks need so every thread sees the same database.
+    """
+    from django.db import connection
+    from django.test.utils import setup_test_environment, teardown_test_environment
+
+    if path is not None:
+        connection.settings_dict.setdefault('TEST', {})['NAME'] = str(path)
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(verbosity=0)
+    try:
+        yield
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        teardown_test_environment()
+
+
+@contextmanager
+def timed(label, count, unit='ops'):
+    """Print the throughput of the wrapped block"""
+    start = time.perf_counter()
+    yield
+    elapsed = time.perf_counter() - start
+    rate = count / elapsed if elapsed else float('inf')
+    print(f"{label:<40} {count:>8} {unit} in {elapsed:8.3f}s  ({rate:,.1f} {unit}/s)")
@@ -0,0 +1,82 @@
+"""
+Admin dashboard counter latency as the tables grow: four live COUNT(*)
+queries (the previous implementation) vs the materialized DashboardStats row,
+then GET /api/admin-dashboard/ in full and revalidated with If-None-Match
+(a 304 whose ETag comes from version counters, not the tables).
+
+Usage: python benchmarks/bench_admin_dashboard.py [--sizes 1000,10000,100000] [--repeat 50]
+"""
+import argparse
+
+from _common import benchmark_database, timed
+
+from django.contrib.auth.models import User
+from rest_framework.test import APIClient
+
+from university.models import Administrator, DashboardStats, Faculty, Professor, Student, Subject
+
+
+def grow_to(size, batch_size=5000):
+    """Bulk insert students (and their users) until there are `size` of them"""
+    existing = Student.objects.count()
+    while existing < size:
+        count = min(batch_size, size - existing)
+        users = User.objects.bulk_create(
+            [User(username=f'bench{existing + i}') for i in range(count)]
+        )
+        Student.objects.bulk_create(
+            [Student(user=user, enrollment_number=f'B{existing + i:08d}') for i, user in enumerate(users)]
+        )
+        existing += count
+    # bulk_create skips signals, so reconcile the counters once
+    DashboardStats.objects.rebuild()
+
+
+def live_counts():
+    return {
+        'total_students': Student.objects.filter(is_active=True).count(),
+        'total_professors': Professor.objects.filter(is_active=True).count(),
+        'total_subjects': Subject.objects.filter(is_active=True).count(),
+        'total_faculties': Faculty.objects.filter(is_active=True).count(),
+    }
+
+
+def materialized_counts():
+    stats = DashboardStats.objects.current()
+    return {
+        'total_students': stats.total_students,
+        'total_professors': stats.total_professors,
+        'total_subjects': stats.total_subjects,
+        'total_faculties': stats.total_faculties,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--sizes', default='1000,10000,100000')
+    parser.add_argument('--repeat', type=int, default=50)
+    args = parser.parse_args()
+
+    with benchmark_database():
+        client = APIClient()
+        client.force_authenticate(Administrator.objects.create(user=User.objects.create(username='admin')).user)
+        for size in (int(value) for value in args.sizes.split(',')):
+            grow_to(size)
+            assert live_counts() == materialized_counts()
+            with timed(f'{size:>9} rows, live COUNT(*)', args.repeat, 'loads'):
+                for _ in range(args.repeat):
+                    live_counts()
+            with timed(f'{size:>9} rows, DashboardStats row', args.repeat, 'loads'):
+                for _ in range(args.repeat):
+                    materialized_counts()
+            etag = client.get('/api/admin-dashboard/')['ETag']
+            with timed(f'{size:>9} rows, dashboard 200', args.repeat, 'requests'):
+                for _ in range(args.repeat):
+                    assert client.get('/api/admin-dashboard/').status_code == 200
+            with timed(f'{size:>9} rows, dashboard 304', args.repeat, 'requests'):
+                for _ in range(args.repeat):
+                    assert client.get('/api/admin-dashboard/', HTTP_IF_NONE_MATCH=etag).status_code == 304
+
+
+if __name__ == '__main__':
+    main()
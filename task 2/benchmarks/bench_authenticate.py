@@ -0,0 +1,75 @@
+"""
+JWTAuthentication.authenticate throughput with and without the
+verified-token and user caches, for HS256 and (when `cryptography` is
+installed) RS256 tokens.
+
+Usage: python benchmarks/bench_authenticate.py [--requests 20000]
+"""
+import argparse
+
+from _common import benchmark_database, timed
+
+from django.contrib.auth.models import User
+from django.test import override_settings
+from rest_framework.test import APIRequestFactory
+
+from university import caching, tokens
+from university.authentication import JWTAuthentication
+from university.models import Student
+from university.permissions import get_user_role
+from university.views import _create_jwt_token
+
+
+def rsa_keys():
+    try:
+        from cryptography.hazmat.primitives import serialization
+        from cryptography.hazmat.primitives.asymmetric import rsa
+    except ImportError:
+        return None
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    private_pem = key.private_bytes(
+        serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()
+    ).decode()
+    public_pem = key.public_key().public_bytes(
+        serialization.Encoding.PEM, serialization.PublicFormat.SubjectPublicKeyInfo
+    ).decode()
+    return {'bench': {'algorithm': 'RS256', 'private_key': private_pem, 'public_key': public_pem}}
+
+
+def run(label, user, count, **overrides):
+    with override_settings(**overrides):
+        caching._user_cache = None
+        tokens._verified_tokens = None
+        token = _create_jwt_token(user, get_user_role(user))
+        request = APIRequestFactory().get('/api/student-dashboard/', HTTP_AUTHORIZATION=f'Bearer {token}')
+        authenticator = JWTAuthentication()
+        with timed(label, count, 'auths'):
+            for _ in range(count):
+                authenticator.authenticate(request)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--requests', type=int, default=20000)
+    args = parser.parse_args()
+
+    with benchmark_database():
+        user = User.objects.create_user('bench', password='bench-pass-123')
+        Student.objects.create(user=user, enrollment_number='BENCH00001')
+
+        no_caches = {'JWT_USER_CACHE_ENABLED': False, 'JWT_VERIFIED_TOKEN_CACHE_SIZE': 0}
+        run('HS256, no caches', user, args.requests, **no_caches)
+        run('HS256, user cache', user, args.requests, JWT_VERIFIED_TOKEN_CACHE_SIZE=0)
+        run('HS256, user + token cache', user, args.requests)
+
+        keys = rsa_keys()
+        if keys is None:
+            print('cryptography not installed, skipping RS256')
+            return
+        rs256 = {'JWT_SIGNING_KEYS': keys, 'JWT_ACTIVE_KID': 'bench'}
+        run('RS256, no caches', user, args.requests, **rs256, **no_caches)
+        run('RS256, user + token cache', user, args.requests, **rs256)
+
+
+if __name__ == '__main__':
+    main()
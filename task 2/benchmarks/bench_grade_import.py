@@ -0,0 +1,77 @@
+"""
+Grade import throughput: the streaming bulk importer vs one get_or_create
+per grade (what grade_student does per request).
+
+Usage: python benchmarks/bench_grade_import.py [--grades 20000] [--baseline 2000]
+"""
+import argparse
+import io
+
+from _common import benchmark_database, timed
+
+from django.contrib.auth.models import User
+
+from university.grade_import import import_grades
+from university.models import Faculty, Grade, Professor, Student, Subject
+
+SUBJECTS = 10
+
+
+def create_dataset(grade_count):
+    faculty = Faculty.objects.create(name='Bench Faculty', department='CS')
+    subjects = Subject.objects.bulk_create(
+        [Subject(name=f'Bench {i}', code=f'BENCH{i}', faculty=faculty) for i in range(SUBJECTS)]
+    )
+    professor = Professor.objects.create(user=User.objects.create_user('bench-prof'), faculty=faculty)
+    professor.subjects.set(subjects)
+
+    student_count = grade_count // SUBJECTS
+    users = User.objects.bulk_create([User(username=f'bench{i}') for i in range(student_count)])
+    students = Student.objects.bulk_create(
+        [Student(user=user, enrollment_number=f'B{i:08d}') for i, user in enumerate(users)]
+    )
+    through = Student.subjects.through
+    through.objects.bulk_create(
+        [through(student_id=student.id, subject_id=subject.id) for student in students for subject in subjects],
+        batch_size=1000,
+    )
+    rows = [(student.id, subject.id) for student in students for subject in subjects]
+    return professor, rows
+
+
+def csv_lines(rows, grade):
+    buffer = io.StringIO()
+    buffer.write('student_id,subject_id,grade,notes\n')
+    for student_id, subject_id in rows:
+        buffer.write(f'{student_id},{subject_id},{grade},bench\n')
+    buffer.seek(0)
+    return buffer
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--grades', type=int, default=20000)
+    parser.add_argument('--baseline', type=int, default=2000, help='Grades written one by one for comparison')
+    args = parser.parse_args()
+
+    with benchmark_database():
+        professor, rows = create_dataset(args.grades)
+
+        baseline = rows[:args.baseline]
+        with timed('get_or_create per grade', len(baseline), 'grades'):
+            for student_id, subject_id in baseline:
+                Grade.objects.get_or_create(
+                    student_id=student_id, subject_id=subject_id, professor=professor,
+                    defaults={'grade': 70, 'notes': 'bench'}
+                )
+
+        with timed('bulk import (insert + update)', len(rows), 'grades'):
+            report = import_grades(professor, csv_lines(rows, 80))
+        assert report['imported'] == len(rows) and not report['errors'], report['errors'][:5]
+
+        with timed('bulk import (update only)', len(rows), 'grades'):
+            import_grades(professor, csv_lines(rows, 90))
+
+
+if __name__ == '__main__':
+    main()
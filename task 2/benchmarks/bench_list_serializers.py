@@ -0,0 +1,76 @@
+"""
+Student and professor list pages built with the ModelSerializers (with_related
+queryset) vs the values()-based ProfileValuesSerializers, queries included.
+
+Usage: python benchmarks/bench_list_serializers.py [--profiles 5000] [--subjects 8] [--page-size 1000] [--repeat 10]
+"""
+import argparse
+
+from _common import benchmark_database, timed
+
+from django.contrib.auth.models import User
+from rest_framework.renderers import JSONRenderer
+
+from university.models import Faculty, Professor, Student, Subject
+from university.read_serializers import ProfessorValuesSerializer, StudentValuesSerializer
+from university.serializers import ProfessorSerializer, StudentSerializer
+
+
+def populate(profiles, subjects):
+    faculty = Faculty.objects.create(name='Bench Faculty', department='CS')
+    subject_rows = Subject.objects.bulk_create([
+        Subject(name=f'Subject {i}', code=f'S{i:03d}', faculty=faculty) for i in range(subjects)
+    ])
+    for model, prefix in ((Student, 'student'), (Professor, 'professor')):
+        users = User.objects.bulk_create([
+            User(username=f'{prefix}{i}', first_name='First', last_name=f'Last {i}', email=f'{prefix}{i}@example.edu')
+            for i in range(profiles)
+        ])
+        rows = model.objects.bulk_create([
+            model(user=user, faculty=faculty, **({'enrollment_number': f'E{i:08d}'} if model is Student else {}))
+            for i, user in enumerate(users)
+        ])
+        through = model.subjects.through
+        owner = model._meta.model_name
+        through.objects.bulk_create([
+            through(**{owner: row, 'subject': subject}) for row in rows for subject in subject_rows
+        ])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--profiles', type=int, default=5000)
+    parser.add_argument('--subjects', type=int, default=8)
+    parser.add_argument('--page-size', type=int, default=1000)
+    parser.add_argument('--repeat', type=int, default=10)
+    args = parser.parse_args()
+
+    cases = (
+        ('students', Student, StudentSerializer, StudentValuesSerializer),
+        ('professors', Professor, ProfessorSerializer, ProfessorValuesSerializer),
+    )
+    with benchmark_database():
+        populate(args.profiles, args.subjects)
+        for name, model, serializer_class, values_serializer_class in cases:
+            queryset = model.objects.with_related().order_by('created_at', 'id')
+            page = slice(0, args.page_size)
+
+            def model_page():
+                return serializer_class(queryset[page], many=True).data
+
+            def values_page():
+                return values_serializer_class(values_serializer_class.rows(queryset)[page]).data
+
+            renderer = JSONRenderer()
+            assert renderer.render(model_page()) == renderer.render(values_page()), f'{name}: outputs differ'
+            print(f'\n{name}: pages of {args.page_size}')
+            with timed('ModelSerializer', args.repeat, 'pages'):
+                for _ in range(args.repeat):
+                    model_page()
+            with timed('ProfileValuesSerializer', args.repeat, 'pages'):
+                for _ in range(args.repeat):
+                    values_page()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,135 @@
+"""
+Login burst: synchronous login_view vs the async login endpoint.
+
+The sync path is driven from a thread pool that stands in for WSGI workers;
+the async path runs the logins on one event loop while password hashing
+happens in the hashing process pool. Besides login throughput, which is
+bound by the CPU cores available for hashing on both paths, it measures how
+long a cheap request (GET /api/jwks/) waits while the burst is in flight:
+on the sync path it queues behind the workers busy hashing, on the async
+path the event loop keeps serving it.
+
+Usage: python benchmarks/bench_login.py [--users 20] [--concurrency 8] [--probes 20]
+"""
+import argparse
+import asyncio
+import statistics
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from _common import benchmark_database, timed
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import AsyncClient, Client
+
+from university.models import Student
+from university.passwords import get_hashing_pool
+
+PASSWORD = 'bench-pass-123'
+
+# Seconds between probe requests while the logins run
+PROBE_INTERVAL = 0.05
+
+
+def create_users(count):
+    users = []
+    for i in range(count):
+        user = User.objects.create_user(f'bench{i}', password=PASSWORD)
+        Student.objects.create(user=user, enrollment_number=f'BENCH{i:05d}')
+        users.append(user.username)
+    return users
+
+
+def _in_worker(func):
+    # Worker threads open their own connections; close them when done
+    def wrapper(*args):
+        try:
+            return func(*args)
+        finally:
+            connection.close()
+    return wrapper
+
+
+def run_sync(usernames, concurrency, probes):
+    """Return probe latencies, in seconds"""
+    @_in_worker
+    def login(username):
+        response = Client().post('/api/login/', {'username': username, 'password': PASSWORD},
+                                 content_type='application/json')
+        assert response.status_code == 200, response.content
+
+    @_in_worker
+    def probe(submitted):
+        response = Client().get('/api/jwks/')
+        assert response.status_code == 200, response.content
+        return time.perf_counter() - submitted
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        logins = [executor.submit(login, username) for username in usernames]
+        pending = []
+        for _ in range(probes):
+            pending.append(executor.submit(probe, time.perf_counter()))
+            time.sleep(PROBE_INTERVAL)
+        for future in logins:
+            future.result()
+        return [future.result() for future in pending]
+
+
+async def run_async(usernames, concurrency, probes):
+    """Return probe latencies, in seconds"""
+    semaphore = asyncio.Semaphore(concurrency)
+    client = AsyncClient()
+
+    async def login(username):
+        async with semaphore:
+            response = await client.post('/api/login-async/', {'username': username, 'password': PASSWORD},
+                                         content_type='application/json')
+            assert response.status_code == 200, response.content
+
+    async def probe_loop():
+        latencies = []
+        for _ in range(probes):
+            start = time.perf_counter()
+            response = await client.get('/api/jwks/')
+            assert response.status_code == 200, response.content
+            latencies.append(time.perf_counter() - start)
+            await asyncio.sleep(PROBE_INTERVAL)
+        return latencies
+
+    results = await asyncio.gather(probe_loop(), *(login(username) for username in usernames))
+    return results[0]
+
+
+def report(latencies):
+    latencies = sorted(latencies)
+    p95 = latencies[max(0, round(len(latencies) * 0.95) - 1)]
+    print(f"{'  probe latency':<40} median {statistics.median(latencies) * 1000:8.1f} ms  p95 {p95 * 1000:8.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--users', type=int, default=20)
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--probes', type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        # Worker threads need one on-disk database, not per-connection in-memory ones
+        with benchmark_database(Path(directory) / 'bench_login.sqlite3'):
+            usernames = create_users(args.users)
+            # Start the hashing workers before timing so spawn cost isn't measured
+            get_hashing_pool().submit(int).result()
+
+            with timed('sync login_view', len(usernames), 'logins'):
+                latencies = run_sync(usernames, args.concurrency, args.probes)
+            report(latencies)
+            with timed('async login_async_view', len(usernames), 'logins'):
+                latencies = asyncio.run(run_async(usernames, args.concurrency, args.probes))
+            report(latencies)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,87 @@
+"""
+Rendering large StudentSerializer and GradeSerializer payloads with DRF's
+JSONRenderer vs FastJSONRenderer (and MessagePackRenderer when msgpack is
+installed). The JSON renderers must produce identical bytes.
+
+Usage: python benchmarks/bench_renderers.py [--students 5000] [--subjects 8] [--repeat 20]
+"""
+import argparse
+from decimal import Decimal
+
+from _common import benchmark_database, timed
+
+from django.contrib.auth.models import User
+from rest_framework.renderers import JSONRenderer
+
+from university import renderers
+from university.models import Faculty, Grade, Professor, Student, Subject
+from university.serializers import GradeSerializer, StudentSerializer
+
+
+def populate(students, subjects):
+    faculty = Faculty.objects.create(name='Bench Faculty', department='CS')
+    subject_rows = Subject.objects.bulk_create([
+        Subject(name=f'Subject {i} – Überblick', code=f'S{i:03d}', faculty=faculty, credits=3 + i % 3)
+        for i in range(subjects)
+    ])
+    professor = Professor.objects.create(
+        user=User.objects.create(username='prof', first_name='Ada', last_name='Lovelace'), faculty=faculty
+    )
+    professor.subjects.set(subject_rows)
+    users = User.objects.bulk_create([
+        User(username=f'student{i}', first_name='Zoë', last_name=f'Nguyễn {i}', email=f'student{i}@example.edu')
+        for i in range(students)
+    ])
+    student_rows = Student.objects.bulk_create([
+        Student(user=user, enrollment_number=f'E{i:08d}', faculty=faculty, phone='555-0100', gpa=Decimal('3.25'))
+        for i, user in enumerate(users)
+    ])
+    Enrollment = Student.subjects.through
+    Enrollment.objects.bulk_create([
+        Enrollment(student=student, subject=subject) for student in student_rows for subject in subject_rows
+    ])
+    # U+2028 in the notes exercises the renderers' separator escaping
+    Grade.objects.bulk_create([
+        Grade(student=student, subject=subject, professor=professor,
+              grade=Decimal(60 + (i + j) % 40), notes='Midterm\u2028and final')
+        for i, student in enumerate(student_rows) for j, subject in enumerate(subject_rows)
+    ])
+
+
+def payloads():
+    students = StudentSerializer(Student.objects.with_related().order_by('id'), many=True).data
+    grades = GradeSerializer(
+        Grade.objects.select_related('student__user', 'subject', 'professor__user').order_by('id'), many=True
+    ).data
+    return {'students': students, 'grades': grades}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--students', type=int, default=5000)
+    parser.add_argument('--subjects', type=int, default=8)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    candidates = [('JSONRenderer (DRF)', JSONRenderer()), ('FastJSONRenderer', renderers.FastJSONRenderer())]
+    if renderers.msgpack is not None:
+        candidates.append(('MessagePackRenderer', renderers.MessagePackRenderer()))
+    print(f"orjson: {'installed' if renderers.orjson is not None else 'not installed, stdlib encoder'}")
+    print(f"msgpack: {'installed' if renderers.msgpack is not None else 'not installed, skipped'}")
+
+    with benchmark_database():
+        populate(args.students, args.subjects)
+        for name, data in payloads().items():
+            print(f'\n{name}: {len(data)} objects')
+            reference = JSONRenderer().render(data)
+            for label, renderer in candidates:
+                body = renderer.render(data)
+                if renderer.format == 'json':
+                    assert body == reference, f'{label} output differs from JSONRenderer'
+                with timed(f'{label} ({len(body):,} bytes)', args.repeat, 'renders'):
+                    for _ in range(args.repeat):
+                        renderer.render(data)
+
+
+if __name__ == '__main__':
+    main()
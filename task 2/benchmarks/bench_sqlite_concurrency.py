@@ -0,0 +1,120 @@
+"""
+Concurrent grade writes and catalog reads against an on-disk SQLite database,
+with the stock connection settings vs the tuned profile from settings.py
+(WAL and pragmas, IMMEDIATE transactions, retry_on_lock).
+
+Usage: python benchmarks/bench_sqlite_concurrency.py [--threads 8] [--writes 200] [--reads 400]
+"""
+import argparse
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from _common import benchmark_database
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import connection, transaction
+from django.db.models import Count
+
+from university.database import is_lock_error, retry_on_lock
+from university.models import Faculty, Grade, Professor, Student, Subject
+
+STUDENTS = 200
+SUBJECTS = 10
+
+# Stock Django settings: rollback journal, deferred transactions, no retry
+BASELINE_PROFILE = {'OPTIONS': {}, 'SQLITE_PRAGMAS': {}, 'retry': False}
+TUNED_PROFILE = {
+    'OPTIONS': settings.DATABASES['default'].get('OPTIONS', {}),
+    'SQLITE_PRAGMAS': settings.SQLITE_PRAGMAS,
+    'retry': True,
+}
+
+
+def create_dataset():
+    faculty = Faculty.objects.create(name='Bench Faculty', department='CS')
+    subjects = Subject.objects.bulk_create(
+        [Subject(name=f'Bench {i}', code=f'BENCH{i}', faculty=faculty) for i in range(SUBJECTS)]
+    )
+    professor = Professor.objects.create(user=User.objects.create_user('bench-prof'), faculty=faculty)
+    professor.subjects.set(subjects)
+    users = User.objects.bulk_create([User(username=f'bench{i}') for i in range(STUDENTS)])
+    students = Student.objects.bulk_create(
+        [Student(user=user, enrollment_number=f'B{i:08d}') for i, user in enumerate(users)]
+    )
+    through = Student.subjects.through
+    through.objects.bulk_create(
+        [through(student_id=student.id, subject_id=subject.id) for student in students for subject in subjects]
+    )
+    return professor.id, [(student.id, subject.id) for student in students for subject in subjects]
+
+
+def write_grade(professor_id, student_id, subject_id, value):
+    """Read-then-write like grade_student: look the grade up, then create or update it"""
+    grade, created = Grade.objects.get_or_create(
+        student_id=student_id, subject_id=subject_id, professor_id=professor_id,
+        defaults={'grade': value}
+    )
+    if not created:
+        grade.grade = value
+        grade.save()
+
+
+def read_catalog():
+    list(Subject.objects.filter(is_active=True).annotate(enrolled=Count('students')).values('id', 'enrolled'))
+
+
+def worker(index, args, professor_id, pairs, use_retry, failures):
+    write = retry_on_lock(write_grade) if use_retry else transaction.atomic(write_grade)
+    try:
+        for n in range(args.writes):
+            student_id, subject_id = pairs[(index * args.writes + n) % len(pairs)]
+            try:
+                write(professor_id, student_id, subject_id, 60 + n % 40)
+            except Exception as exc:
+                if not is_lock_error(exc):
+                    raise
+                failures.append(exc)
+            for _ in range(args.reads // args.writes):
+                read_catalog()
+    finally:
+        connection.close()
+
+
+def run(label, profile, args):
+    settings.DATABASES['default']['OPTIONS'] = dict(profile['OPTIONS'])
+    settings.SQLITE_PRAGMAS = profile['SQLITE_PRAGMAS']
+    with tempfile.TemporaryDirectory() as directory, benchmark_database(Path(directory) / 'bench.sqlite3'):
+        professor_id, pairs = create_dataset()
+        connection.close()
+        failures = []
+        threads = [
+            threading.Thread(target=worker, args=(i, args, professor_id, pairs, profile['retry'], failures))
+            for i in range(args.threads)
+        ]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+        written = args.threads * args.writes - len(failures)
+        print(f"{label:<40} {written:>8} writes in {elapsed:8.3f}s  ({written / elapsed:,.1f} writes/s), "
+              f"{len(failures)} failed with 'database is locked'")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--writes', type=int, default=200, help='Grade writes per thread')
+    parser.add_argument('--reads', type=int, default=400, help='Catalog reads per thread')
+    args = parser.parse_args()
+
+    run('stock sqlite settings', BASELINE_PROFILE, args)
+    run('tuned profile (WAL, IMMEDIATE, retry)', TUNED_PROFILE, args)
+
+
+if __name__ == '__main__':
+    main()
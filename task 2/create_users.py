@@ -128,7 +128,6 @@ student, _ = Student.objects.get_or_create(
         'enrollment_number': 'STU001',
         'faculty': cs_faculty,
         'phone': '5555555555',
-        'gpa': 3.85
     }
 )
 # Add subjects to student
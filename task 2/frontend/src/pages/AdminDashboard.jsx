@@ -647,7 +647,6 @@ function StudentForm({ student, faculties, onClose, onSave }) {
     enrollment_number: student?.enrollment_number || '',
     faculty: student?.faculty || '',
     phone: student?.phone || '',
-    gpa: student?.gpa || '0.00',
     is_active: student?.is_active !== undefined ? student.is_active : true,
   });
 
@@ -767,18 +766,18 @@ function StudentForm({ student, faculties, onClose, onSave }) {
               style={{ width: '100%', padding: '8px', borderRadius: '4px', border: '1px solid #ccc' }}
             />
           </div>
-          <div style={{ marginBottom: '15px' }}>
-            <label style={{ display: 'block', marginBottom: '5px' }}>GPA</label>
-            <input
-              type="number"
-              step="0.01"
-              min="0"
-              max="4"
-              value={formData.gpa}
-              onChange={(e) => setFormData({...formData, gpa: e.target.value})}
-              style={{ width: '100%', padding: '8px', borderRadius: '4px', border: '1px solid #ccc' }}
-            />
-          </div>
+          {student && (
+            <div style={{ marginBottom: '15px' }}>
+              <label style={{ display: 'block', marginBottom: '5px' }}>GPA (calculated from grades)</label>
+              <input
+                type="text"
+                value={student.gpa != null ? Number(student.gpa).toFixed(2) : '0.00'}
+                readOnly
+                disabled
+                style={{ width: '100%', padding: '8px', borderRadius: '4px', border: '1px solid #ccc' }}
+              />
+            </div>
+          )}
           <div style={{ marginBottom: '15px' }}>
             <label style={{ display: 'flex', alignItems: 'center', gap: '10px' }}>
               <input
@@ -121,12 +121,30 @@ export const dashboardService = {
   getStudentDashboard: () => api.get('/student-dashboard/'),
 };
 
+// List endpoints are cursor-paginated: follow `next` links and
+// resolve with the combined rows in `data`, like a plain list response.
+// Pages are requested at the server's maximum size (1000) to keep round
+// trips down, but the admin tables still load every row, one page after
+// another; very large tables need server-side paging in the UI instead.
+const MAX_PAGE_SIZE = 1000;
+
+const getAllPages = async (url) => {
+  const results = [];
+  let response = await api.get(url, { params: { page_size: MAX_PAGE_SIZE } });
+  results.push(...response.data.results);
+  while (response.data.next) {
+    response = await api.get(response.data.next);
+    results.push(...response.data.results);
+  }
+  return { ...response, data: results };
+};
+
 export const resourceService = {
-  getFaculties: () => api.get('/faculties/'),
-  getSubjects: () => api.get('/subjects/'),
-  getProfessors: () => api.get('/professors/'),
-  getStudents: () => api.get('/students/'),
-  getAdministrators: () => api.get('/administrators/'),
+  getFaculties: () => getAllPages('/faculties/'),
+  getSubjects: () => getAllPages('/subjects/'),
+  getProfessors: () => getAllPages('/professors/'),
+  getStudents: () => getAllPages('/students/'),
+  getAdministrators: () => getAllPages('/administrators/'),
   // Professor CRUD
   createProfessor: (data) => api.post('/professors/', data),
   updateProfessor: (id, data) => api.put(`/professors/${id}/`, data),
@@ -151,6 +169,9 @@ export const gradeService = {
     }
     return api.get(`/grades/${studentId}/`);
   },
+  getGradebook: (subjectId = null) => {
+    return api.get('/gradebook/', { params: subjectId ? { subject_id: subjectId } : {} });
+  },
   gradeStudent: (studentId, subjectId, grade, notes = '') => {
     return api.post(`/grade/${studentId}/${subjectId}/`, { grade, notes });
   },
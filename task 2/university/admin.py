@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Faculty, Subject, Administrator, Professor, Student, RefreshToken
+from .models import Faculty, Subject, Administrator, Professor, Student, RefreshToken, RevokedToken, DashboardStats
 
 
 @admin.register(Faculty)
@@ -41,12 +41,27 @@ class StudentAdmin(admin.ModelAdmin):
     list_filter = ('faculty', 'is_active')
     search_fields = ('user__username', 'user__email', 'enrollment_number')
     filter_horizontal = ('subjects',)
-    readonly_fields = ('created_at', 'updated_at')
+    # GPA and its running sums are maintained from grades
+    readonly_fields = ('gpa', 'gpa_credits', 'gpa_points', 'created_at', 'updated_at')
 
 
 @admin.register(RefreshToken)
 class RefreshTokenAdmin(admin.ModelAdmin):
-    list_display = ('user', 'token', 'expires_at', 'created_at')
+    list_display = ('user', 'expires_at', 'created_at')
+    list_filter = ('expires_at', 'created_at')
+    search_fields = ('user__username',)
+    readonly_fields = ('token_hash', 'created_at')
+
+
+@admin.register(RevokedToken)
+class RevokedTokenAdmin(admin.ModelAdmin):
+    list_display = ('jti', 'expires_at', 'created_at')
     list_filter = ('expires_at', 'created_at')
-    search_fields = ('user__username', 'token')
-    readonly_fields = ('token', 'created_at')
+    search_fields = ('jti',)
+    readonly_fields = ('jti', 'created_at')
+
+
+@admin.register(DashboardStats)
+class DashboardStatsAdmin(admin.ModelAdmin):
+    list_display = ('total_students', 'total_professors', 'total_subjects', 'total_faculties', 'updated_at')
+    readonly_fields = ('total_students', 'total_professors', 'total_subjects', 'total_faculties', 'updated_at')
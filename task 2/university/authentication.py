@@ -2,7 +2,9 @@ from rest_framework.authentication import BaseAuthentication
 from rest_framework.exceptions import AuthenticationFailed, NotAuthenticated
 from django.contrib.auth.models import User
 import jwt
-from django.conf import settings
+from .caching import get_active_user
+from .revocation import is_revoked
+from .tokens import decode_access_token
 
 
 class JWTAuthentication(BaseAuthentication):
@@ -25,7 +27,7 @@ class JWTAuthentication(BaseAuthentication):
         # If no Authorization header, check if this is an AllowAny endpoint
         if not auth_header:
             # List of endpoints that allow anonymous access
-            allow_any_paths = ['/api/login/', '/api/logout/', '/api/renew/']
+            allow_any_paths = ['/api/login/', '/api/logout/', '/api/renew/', '/api/jwks/']
             path = request.path
             
             # If it's an AllowAny endpoint, return None (let permission class handle it)
@@ -53,11 +55,9 @@ class JWTAuthentication(BaseAuthentication):
         
         try:
             # Decode and verify token
-            payload = jwt.decode(
-                token,
-                settings.JWT_SECRET_KEY,
-                algorithms=[settings.JWT_ALGORITHM]
-            )
+            payload = decode_access_token(token)
+            if is_revoked(payload):
+                raise AuthenticationFailed('Token has been revoked')
             
             # Get user from payload
             user_id = payload.get('user_id')
@@ -65,9 +65,14 @@ class JWTAuthentication(BaseAuthentication):
                 raise AuthenticationFailed('Invalid token payload')
             
             try:
-                user = User.objects.get(id=user_id, is_active=True)
+                user = get_active_user(user_id)
             except User.DoesNotExist:
                 raise AuthenticationFailed('User not found or inactive')
+
+            # The role claim is signed; it picks the default profile, permissions check the rows
+            role = payload.get('role')
+            if role:
+                user.role = role
             
             return (user, token)
             
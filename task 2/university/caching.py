@@ -0,0 +1,303 @@
+import copy
+import hashlib
+import math
+import threading
+import time
+from collections import OrderedDict
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from rest_framework.response import Response
+
+from .routers import reading_from_replica
+
+
+class TTLCache:
+    """
+    Small thread-safe LRU cache with a per-entry time to live.
+    Entries are dropped when they expire or when the cache grows past `maxsize`.
+    """
+
+    def __init__(self, maxsize=1024, ttl=60):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or entry[1] <= now:
+                if entry is not None:
+                    del self._data[key]
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def set(self, key, value, ttl=None):
+        expires = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._data[key] = (value, expires)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key):
+        with self._lock:
+            entry = self._data.pop(key, None)
+        return entry[0] if entry is not None else None
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        """Return hit/miss counters and current size"""
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'size': len(self._data),
+                'maxsize': self.maxsize,
+            }
+
+
+_user_cache = None
+
+
+def get_user_cache():
+    """Return the per-process user cache, or None when it is disabled"""
+    global _user_cache
+    if not getattr(settings, 'JWT_USER_CACHE_ENABLED', True):
+        return None
+    if _user_cache is None:
+        _user_cache = TTLCache(
+            maxsize=getattr(settings, 'JWT_USER_CACHE_SIZE', 1024),
+            ttl=getattr(settings, 'JWT_USER_CACHE_TTL_SECONDS', 60),
+        )
+    return _user_cache
+
+
+def invalidate_user(user_id):
+    """Drop a cached user so the next request reloads it from the database"""
+    if _user_cache is not None:
+        _user_cache.pop(user_id)
+
+
+def _copy_user(user):
+    """Copy a cached user and its joined profiles for use by one request"""
+    user_copy = copy.copy(user)
+    for name, related in user_copy._state.fields_cache.items():
+        if related is not None:
+            user_copy._state.fields_cache[name] = copy.copy(related)
+    return user_copy
+
+
+def get_active_user(user_id):
+    """
+    Load an active user together with its role profiles.
+    Raises User.DoesNotExist when the user is missing or inactive.
+    """
+    from .permissions import get_user_role
+
+    cache = get_user_cache()
+    if cache is not None:
+        cached = cache.get(user_id)
+        if cached is not None:
+            # Hand out a copy so per-request state never leaks between requests
+            return _copy_user(cached)
+
+    # Join the reverse one-to-ones so role checks don't need extra queries
+    user = User.objects.select_related('administrator', 'professor', 'student').get(
+        id=user_id, is_active=True
+    )
+    user.role = get_user_role(user)
+    if cache is not None:
+        cache.set(user_id, user)
+        return _copy_user(user)
+    return user
+
+
+# Versioned response cache for read-mostly endpoints.
+# Every cached response is keyed by the version numbers of the models it was
+# built from; saving or deleting one of them bumps its version, so older
+# entries are simply never looked up again and expire on their own.
+
+def get_response_cache():
+    """Return the Django cache backend used for responses, or None when disabled"""
+    if not getattr(settings, 'RESPONSE_CACHE_ENABLED', True):
+        return None
+    return caches[settings.RESPONSE_CACHE_ALIAS]
+
+
+def is_process_local(cache):
+    """True for backends whose entries other processes can't see"""
+    return isinstance(cache, (LocMemCache, DummyCache))
+
+
+def _version_key(label):
+    return f'version:{label}'
+
+
+def _modified_key(label):
+    return f'modified:{label}'
+
+
+def model_version(cache, label):
+    """Current version of a model's rows (`app_label.ModelName`)"""
+    key = _version_key(label)
+    version = cache.get(key)
+    if version is None:
+        # Start from the clock so a version lost to eviction is never reused
+        cache.add(key, time.time_ns(), timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def model_modified(cache, label):
+    """Unix time (whole seconds) of the latest version bump of a model's rows"""
+    key = _modified_key(label)
+    modified = cache.get(key)
+    if modified is None:
+        # Unknown history: any change may have happened up to now
+        cache.add(key, math.ceil(time.time()), timeout=None)
+        modified = cache.get(key)
+    return modified
+
+
+def bump_model_version(label):
+    """Invalidate every cached response built from this model"""
+    cache = get_response_cache()
+    if cache is None:
+        return
+    try:
+        cache.incr(_version_key(label))
+    except ValueError:
+        cache.set(_version_key(label), time.time_ns(), timeout=None)
+    # Last-Modified has one-second resolution, so every bump moves it forward
+    # by at least a second; otherwise a second change within the same second
+    # would still satisfy If-Modified-Since.
+    previous = cache.get(_modified_key(label), 0)
+    cache.set(_modified_key(label), max(previous + 1, math.ceil(time.time())), timeout=None)
+
+
+def response_cache_key(cache, request, labels):
+    """Cache key from the model versions, scheme, host, path and sorted query string"""
+    versions = '.'.join(f'{label}={model_version(cache, label)}' for label in labels)
+    query = urlencode(sorted(request.GET.lists()), doseq=True)
+    raw = f'{versions}|{request.scheme}://{request.get_host()}{request.path}?{query}'
+    return 'response:' + hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+
+class _LookupCounter:
+    """
+    Per-process response cache hit/miss counts. They are added to the shared
+    counters once every RESPONSE_CACHE_STATS_FLUSH_EVERY lookups, so the hot
+    path doesn't write to the cache backend on every request. Backend incr is
+    not atomic on every backend, so the shared totals are approximate.
+    """
+
+    def __init__(self):
+        self._pending = {'hits': 0, 'misses': 0}
+        self._lock = threading.Lock()
+
+    def count(self, cache, name):
+        with self._lock:
+            self._pending[name] += 1
+            due = sum(self._pending.values()) >= getattr(settings, 'RESPONSE_CACHE_STATS_FLUSH_EVERY', 100)
+        if due:
+            self.flush(cache)
+
+    def flush(self, cache):
+        """Add this process's pending counts to the shared counters"""
+        with self._lock:
+            pending, self._pending = self._pending, {'hits': 0, 'misses': 0}
+        for name, value in pending.items():
+            if not value:
+                continue
+            key = f'stats:{name}'
+            if not cache.add(key, value, timeout=None):
+                try:
+                    cache.incr(key, value)
+                except ValueError:
+                    cache.set(key, value, timeout=None)
+
+    def discard(self):
+        with self._lock:
+            self._pending = {'hits': 0, 'misses': 0}
+
+
+_lookups = _LookupCounter()
+
+
+def response_cache_stats():
+    """Hit/miss counters shared by every process using the response cache, including this one's pending counts"""
+    cache = get_response_cache()
+    if cache is None:
+        return None
+    _lookups.flush(cache)
+    hits = cache.get('stats:hits', 0)
+    misses = cache.get('stats:misses', 0)
+    lookups = hits + misses
+    return {'hits': hits, 'misses': misses, 'hit_ratio': hits / lookups if lookups else 0.0}
+
+
+def flush_response_cache_stats():
+    """Add this process's pending hit/miss counts to the shared counters"""
+    cache = get_response_cache()
+    if cache is not None:
+        _lookups.flush(cache)
+
+
+def reset_response_cache_stats():
+    cache = get_response_cache()
+    if cache is not None:
+        _lookups.discard()
+        cache.delete_many(['stats:hits', 'stats:misses'])
+
+
+class CachedResponseMixin:
+    """
+    ViewSet mixin caching list/retrieve response data in the response cache.
+    `cache_models` lists the model labels the serialized data depends on;
+    their versions are part of the key. Responses carry an X-Cache header.
+    """
+    cache_models = ()
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(super().retrieve, request, *args, **kwargs)
+
+    def cached_response(self, handler, request, *args, **kwargs):
+        cache = get_response_cache()
+        if cache is None:
+            return handler(request, *args, **kwargs)
+
+        key = response_cache_key(cache, request, self.cache_models)
+        data = cache.get(key)
+        if data is not None:
+            _lookups.count(cache, 'hits')
+            response = Response(data)
+            response['X-Cache'] = 'HIT'
+            return response
+
+        _lookups.count(cache, 'misses')
+        response = handler(request, *args, **kwargs)
+        # Replica reads may predate the current version, so only primary reads are stored
+        if response.status_code == 200 and not reading_from_replica():
+            cache.set(key, response.data, timeout=settings.RESPONSE_CACHE_TIMEOUT)
+        response['X-Cache'] = 'MISS'
+        return response
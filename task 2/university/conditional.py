@@ -0,0 +1,93 @@
+import functools
+import hashlib
+from datetime import datetime, timezone as dt_timezone
+
+from django.utils.cache import patch_cache_control
+from django.views.decorators.http import condition
+
+from .caching import get_response_cache, model_modified, model_version
+from .routers import reading_from_replica
+
+
+class ResourceState:
+    """
+    Cheap validators for a response built from a set of sources: models or
+    model labels (e.g. 'auth.User'), each summarised by its response cache
+    version and the time of its latest bump. Versions are bumped on commit
+    by the signals and by the bulk write paths that bypass them, so saves,
+    deletions and GPA updates all change the ETag and Last-Modified without
+    reading the source tables.
+    """
+
+    def __init__(self, request, sources):
+        self.request = request
+        self.labels = [source if isinstance(source, str) else source._meta.label for source in sources]
+        self._computed = False
+        self._etag = None
+        self._last_modified = None
+
+    def _compute(self):
+        self._computed = True
+        cache = get_response_cache()
+        if cache is None:
+            # Without version counters changes can't be seen, so send no validators
+            return
+        if reading_from_replica():
+            # The replica may lag the primary's versions; a stale body must not get a current validator
+            return
+        request = self.request
+        renderer = getattr(request, 'accepted_renderer', None)
+        parts = [f'{label}={model_version(cache, label)}' for label in self.labels]
+        parts.append(f'user={request.user.pk}')
+        parts.append(f"format={getattr(renderer, 'format', '')}")
+        parts.append(request.get_full_path())
+        self._etag = hashlib.sha256('|'.join(parts).encode('utf-8')).hexdigest()[:32]
+        if self.labels:
+            modified = max(model_modified(cache, label) for label in self.labels)
+            self._last_modified = datetime.fromtimestamp(modified, tz=dt_timezone.utc)
+
+    def etag(self, request, *args, **kwargs):
+        if not self._computed:
+            self._compute()
+        return self._etag
+
+    def last_modified(self, request, *args, **kwargs):
+        if not self._computed:
+            self._compute()
+        return self._last_modified
+
+
+def conditional_response(handler, request, sources, *args, **kwargs):
+    """Call `handler`, answering 304 Not Modified when the client's copy is current"""
+    state = ResourceState(request, sources)
+    view = condition(etag_func=state.etag, last_modified_func=state.last_modified)(handler)
+    response = view(request, *args, **kwargs)
+    if response.has_header('ETag'):
+        # Per-user data: browsers may keep it but must revalidate before reuse
+        patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
+def conditional_get(*sources):
+    """
+    Decorator adding ETag/Last-Modified and 304 responses to a DRF function
+    view; apply it below @api_view/@permission_classes so the validators are
+    only computed for authenticated, permitted requests.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(request, *args, **kwargs):
+            return conditional_response(func, request, sources, *args, **kwargs)
+        return wrapper
+    return decorator
+
+
+class ConditionalGetMixin:
+    """ViewSet mixin adding conditional GET to list/retrieve; `condition_sources` as for ResourceState"""
+    condition_sources = ()
+
+    def list(self, request, *args, **kwargs):
+        return conditional_response(super().list, request, self.condition_sources, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return conditional_response(super().retrieve, request, self.condition_sources, *args, **kwargs)
@@ -0,0 +1,57 @@
+import functools
+import os
+import random
+import time
+
+from django.conf import settings
+from django.db import OperationalError, connection, transaction
+
+
+def configure_sqlite(sender, connection, **kwargs):
+    """connection_created hook: apply settings.SQLITE_PRAGMAS to every new SQLite connection"""
+    if connection.vendor != 'sqlite':
+        return
+    pragmas = getattr(settings, 'SQLITE_PRAGMAS', {})
+    with connection.cursor() as cursor:
+        for name, value in pragmas.items():
+            cursor.execute(f'PRAGMA {name} = {value}')
+
+
+def is_lock_error(exc):
+    """True for SQLite's "database is locked" / "database table is locked" errors"""
+    return isinstance(exc, OperationalError) and 'locked' in str(exc)
+
+
+def retry_on_lock(func):
+    """
+    Run a write path in a transaction, retrying it with bounded, jittered
+    exponential backoff when SQLite reports the database as locked.
+    Retries only happen at the outermost transaction level; inside an
+    enclosing atomic block the error is raised to the caller as usual.
+    """
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        attempts = settings.DB_LOCK_RETRY_ATTEMPTS
+        delay = settings.DB_LOCK_RETRY_BASE_DELAY
+        for attempt in range(1, attempts + 1):
+            retryable = not connection.in_atomic_block
+            try:
+                with transaction.atomic():
+                    return func(*args, **kwargs)
+            except OperationalError as exc:
+                if not retryable or attempt == attempts or not is_lock_error(exc):
+                    raise
+            time.sleep(delay * random.uniform(0.5, 1.0))
+            delay = min(delay * 2, settings.DB_LOCK_RETRY_MAX_DELAY)
+    return wrapper
+
+
+def setup_worker(settings_module):
+    """
+    ProcessPoolExecutor initializer that sets Django up in a spawned worker
+    (the login hashing pool and recompute_gpa --workers). It lives here,
+    away from model imports, so a child can unpickle it before Django is set up.
+    """
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', settings_module)
+    import django
+    django.setup()
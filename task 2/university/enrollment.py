@@ -0,0 +1,93 @@
+from django.db import transaction
+
+from .caching import bump_model_version
+from .models import Student, Subject
+
+# Keep `IN (...)` lists well below SQLite's bound-parameter limit
+ID_CHUNK_SIZE = 500
+
+
+def _chunks(values, size=ID_CHUNK_SIZE):
+    values = list(values)
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+
+def _existing_ids(queryset, ids):
+    """Subset of `ids` present in `queryset`, fetched in chunks"""
+    found = set()
+    for chunk in _chunks(ids):
+        found.update(queryset.filter(id__in=chunk).values_list('id', flat=True))
+    return found
+
+
+def _existing_enrollments(student_ids, subject_ids):
+    through = Student.subjects.through
+    found = set()
+    for chunk in _chunks(student_ids):
+        found.update(
+            through.objects.filter(student_id__in=chunk, subject_id__in=subject_ids)
+            .values_list('student_id', 'subject_id')
+        )
+    return found
+
+
+def _parse_pair(item):
+    try:
+        return int(item['student_id']), int(item['subject_id'])
+    except (TypeError, KeyError, ValueError):
+        return None
+
+
+def bulk_enroll(items, professor=None):
+    """
+    Enroll many (student_id, subject_id) pairs at once.
+    Validation runs as a few set-based queries and new pairs are written with
+    one bulk insert into the Student.subjects through table. When `professor`
+    is given, only subjects they teach are accepted.
+    Returns one result dict per input item, in input order.
+    """
+    pairs = [_parse_pair(item) for item in items]
+    valid = [pair for pair in pairs if pair is not None]
+    student_ids = {student_id for student_id, _ in valid}
+    subject_ids = {subject_id for _, subject_id in valid}
+
+    active_students = _existing_ids(Student.objects.filter(is_active=True), student_ids)
+    active_subjects = _existing_ids(Subject.objects.filter(is_active=True), subject_ids)
+    taught_subjects = (
+        _existing_ids(professor.subjects.all(), active_subjects) if professor is not None else active_subjects
+    )
+    enrolled = _existing_enrollments(active_students, taught_subjects)
+
+    results = []
+    new_pairs = []
+    for item, pair in zip(items, pairs):
+        if pair is None:
+            results.append({'item': item, 'status': 'invalid'})
+            continue
+        student_id, subject_id = pair
+        if student_id not in active_students:
+            result_status = 'student_not_found'
+        elif subject_id not in active_subjects:
+            result_status = 'subject_not_found'
+        elif subject_id not in taught_subjects:
+            result_status = 'not_teaching'
+        elif pair in enrolled:
+            result_status = 'already_enrolled'
+        else:
+            result_status = 'enrolled'
+            enrolled.add(pair)
+            new_pairs.append(pair)
+        results.append({'student_id': student_id, 'subject_id': subject_id, 'status': result_status})
+
+    through = Student.subjects.through
+    with transaction.atomic():
+        through.objects.bulk_create(
+            [through(student_id=student_id, subject_id=subject_id) for student_id, subject_id in new_pairs],
+            ignore_conflicts=True,
+            batch_size=ID_CHUNK_SIZE,
+        )
+        if new_pairs:
+            # bulk_create sends no m2m_changed, so bump the version the signal would
+            transaction.on_commit(lambda: bump_model_version(through._meta.label))
+    return results
@@ -0,0 +1,128 @@
+import csv
+import json
+from datetime import date, datetime
+from decimal import Decimal
+
+from .models import Grade, Student
+
+FORMATS = ('csv', 'jsonl')
+
+CONTENT_TYPES = {
+    'csv': 'text/csv; charset=utf-8',
+    'jsonl': 'application/x-ndjson; charset=utf-8',
+}
+
+# Rows fetched from the database per round trip and written per chunk
+CHUNK_SIZE = 2000
+
+# (column name, lookup) pairs; each export reads exactly these columns in one joined query
+GRADE_COLUMNS = (
+    ('student_id', 'student_id'),
+    ('enrollment_number', 'student__enrollment_number'),
+    ('student_username', 'student__user__username'),
+    ('student_first_name', 'student__user__first_name'),
+    ('student_last_name', 'student__user__last_name'),
+    ('subject_id', 'subject_id'),
+    ('subject_code', 'subject__code'),
+    ('subject_name', 'subject__name'),
+    ('professor_id', 'professor_id'),
+    ('professor_username', 'professor__user__username'),
+    ('professor_first_name', 'professor__user__first_name'),
+    ('professor_last_name', 'professor__user__last_name'),
+    ('grade', 'grade'),
+    ('notes', 'notes'),
+    ('updated_at', 'updated_at'),
+)
+
+ROSTER_COLUMNS = (
+    ('subject_id', 'subject_id'),
+    ('subject_code', 'subject__code'),
+    ('subject_name', 'subject__name'),
+    ('student_id', 'student_id'),
+    ('enrollment_number', 'student__enrollment_number'),
+    ('username', 'student__user__username'),
+    ('first_name', 'student__user__first_name'),
+    ('last_name', 'student__user__last_name'),
+    ('email', 'student__user__email'),
+    ('faculty', 'student__faculty__name'),
+    ('gpa', 'student__gpa'),
+)
+
+
+def grade_rows(subject_ids=None, professor=None):
+    """
+    Active grades joined with student, subject and professor names, as value
+    tuples; with `professor`, only the grades that professor gave
+    """
+    grades = Grade.objects.filter(is_active=True)
+    if subject_ids is not None:
+        grades = grades.filter(subject_id__in=subject_ids)
+    if professor is not None:
+        grades = grades.filter(professor=professor)
+    return _rows(grades.order_by('subject_id', 'student_id', 'id'), GRADE_COLUMNS)
+
+
+def roster_rows(subject_ids=None, professor=None):
+    """
+    Enrolled (subject, student) pairs of active students, as value tuples.
+    Enrollment isn't per professor, so `professor` doesn't narrow the roster.
+    """
+    enrollments = Student.subjects.through.objects.filter(student__is_active=True)
+    if subject_ids is not None:
+        enrollments = enrollments.filter(subject_id__in=subject_ids)
+    return _rows(enrollments.order_by('subject_id', 'student_id'), ROSTER_COLUMNS)
+
+
+def _rows(queryset, columns):
+    # values_list joins the related tables like select_related, without building model instances
+    return queryset.values_list(*(lookup for _, lookup in columns)).iterator(chunk_size=CHUNK_SIZE)
+
+
+class _LineBuffer:
+    """File-like object that hands back what csv.writer writes"""
+
+    def write(self, value):
+        return value
+
+
+def _json_default(value):
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f'Object of type {type(value).__name__} is not JSON serializable')
+
+
+def stream_csv(rows, columns):
+    """Yield CSV text, a header line and then one chunk of lines at a time"""
+    writer = csv.writer(_LineBuffer())
+    yield writer.writerow([name for name, _ in columns])
+    chunk = []
+    for row in rows:
+        chunk.append(writer.writerow(row))
+        if len(chunk) >= CHUNK_SIZE:
+            yield ''.join(chunk)
+            chunk = []
+    if chunk:
+        yield ''.join(chunk)
+
+
+def stream_jsonl(rows, columns):
+    """Yield JSON Lines text, one chunk of objects at a time"""
+    names = [name for name, _ in columns]
+    chunk = []
+    for row in rows:
+        chunk.append(json.dumps(dict(zip(names, row)), default=_json_default) + '\n')
+        if len(chunk) >= CHUNK_SIZE:
+            yield ''.join(chunk)
+            chunk = []
+    if chunk:
+        yield ''.join(chunk)
+
+
+def stream_export(rows, columns, file_format):
+    if file_format not in FORMATS:
+        raise ValueError(f'Unsupported format: {file_format}')
+    if file_format == 'csv':
+        return stream_csv(rows, columns)
+    return stream_jsonl(rows, columns)
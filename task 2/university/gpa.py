@@ -0,0 +1,152 @@
+from decimal import ROUND_HALF_UP, Decimal
+
+from django.db import models, transaction
+
+from .caching import bump_model_version, invalidate_user
+from .models import Grade, Student, Subject
+
+# Minimum grade (0-100) for each grade point on the 4.0 scale
+GRADE_POINT_SCALE = ((90, 4), (80, 3), (70, 2), (60, 1))
+
+TWO_PLACES = Decimal('0.01')
+
+
+def grade_points(grade):
+    """Grade points (4.0 scale) earned for a 0-100 grade"""
+    for minimum, points in GRADE_POINT_SCALE:
+        if grade >= minimum:
+            return Decimal(points)
+    return Decimal(0)
+
+
+def compute_gpa(credits, points):
+    if not credits:
+        return Decimal('0.00')
+    return (Decimal(points) / credits).quantize(TWO_PLACES, rounding=ROUND_HALF_UP)
+
+
+def contribution(grade, credits):
+    """(credits, credit-weighted points) a single active grade adds to its student"""
+    return credits, grade_points(Decimal(str(grade))) * credits
+
+
+def apply_delta(student_id, credits_delta, points_delta):
+    """Adjust one student's running sums and GPA in constant time"""
+    if not credits_delta and not points_delta:
+        return
+    with transaction.atomic():
+        row = (
+            Student.objects.select_for_update()
+            .filter(pk=student_id)
+            .values('user_id', 'gpa_credits', 'gpa_points')
+            .first()
+        )
+        if row is None:
+            return
+        credits = row['gpa_credits'] + credits_delta
+        points = row['gpa_points'] + points_delta
+        Student.objects.filter(pk=student_id).update(
+            gpa_credits=credits, gpa_points=points, gpa=compute_gpa(credits, points)
+        )
+        transaction.on_commit(lambda: invalidate_user(row['user_id']))
+        # .update() sends no post_save, so bump the version the signal would
+        transaction.on_commit(lambda: bump_model_version(Student._meta.label))
+
+
+def _points_expression():
+    whens = [
+        models.When(grade__gte=minimum, then=models.F('subject__credits') * points)
+        for minimum, points in GRADE_POINT_SCALE
+    ]
+    return models.Case(*whens, default=models.Value(0), output_field=models.DecimalField())
+
+
+def compute_totals(student_ids, grade_model=Grade):
+    """
+    Aggregate {student_id: (credits, points)} from active grades.
+    Students without grades are included with zero totals.
+    `grade_model` lets migrations pass their historical Grade.
+    """
+    totals = {student_id: (0, Decimal(0)) for student_id in student_ids}
+    rows = (
+        grade_model.objects.filter(student_id__in=student_ids, is_active=True)
+        .values('student_id')
+        .annotate(credits=models.Sum('subject__credits'), points=models.Sum(_points_expression()))
+    )
+    for row in rows:
+        totals[row['student_id']] = (row['credits'] or 0, Decimal(row['points'] or 0))
+    return totals
+
+
+def write_totals(totals, student_model=Student):
+    """Store recomputed totals with one bulk update"""
+    students = [
+        student_model(id=student_id, gpa_credits=credits, gpa_points=points, gpa=compute_gpa(credits, points))
+        for student_id, (credits, points) in totals.items()
+    ]
+    student_model.objects.bulk_update(students, ['gpa_credits', 'gpa_points', 'gpa'], batch_size=500)
+    if student_model is not Student:
+        # Historical models in migrations: no caches to refresh
+        return
+    user_ids = list(Student.objects.filter(id__in=list(totals)).values_list('user_id', flat=True))
+    transaction.on_commit(lambda: [invalidate_user(user_id) for user_id in user_ids])
+    transaction.on_commit(lambda: bump_model_version(Student._meta.label))
+
+
+def recompute(student_ids):
+    """Recompute GPA for a set of students, e.g. after a bulk grade write"""
+    student_ids = list(student_ids)
+    if student_ids:
+        write_totals(compute_totals(student_ids))
+
+
+def recompute_subject(subject_id):
+    """Recompute every student graded in a subject (its credit weight changed)"""
+    student_ids = set(Grade.objects.filter(subject_id=subject_id).order_by().values_list('student_id', flat=True))
+    recompute(student_ids)
+
+
+def grade_saved(grade, created):
+    """Apply a created or updated Grade to its student's running sums"""
+    before = None if created else getattr(grade, '_gpa_snapshot', None)
+    if not created and (before is None or before[2] is None):
+        # Previous values unknown, fall back to an exact recompute
+        recompute([grade.student_id])
+        snapshot_grade(grade)
+        return
+    credits_by_subject = {grade.subject_id: grade.subject.credits}
+    if before is not None and before[1] not in credits_by_subject:
+        credits_by_subject[before[1]] = Subject.objects.values_list('credits', flat=True).get(pk=before[1])
+
+    deltas = {}
+    if before is not None and before[3]:
+        credits, points = contribution(before[2], credits_by_subject[before[1]])
+        deltas[before[0]] = (-credits, -points)
+    if grade.is_active:
+        credits, points = contribution(grade.grade, credits_by_subject[grade.subject_id])
+        old_credits, old_points = deltas.get(grade.student_id, (0, Decimal(0)))
+        deltas[grade.student_id] = (old_credits + credits, old_points + points)
+
+    for student_id, (credits, points) in deltas.items():
+        apply_delta(student_id, credits, points)
+    snapshot_grade(grade)
+
+
+def grade_deleted(grade):
+    """Remove a deleted Grade from its student's running sums"""
+    snapshot = getattr(grade, '_gpa_snapshot', None)
+    if snapshot is None or snapshot[2] is None or not snapshot[3]:
+        return
+    credits = Subject.objects.filter(pk=snapshot[1]).values_list('credits', flat=True).first()
+    if credits is None:
+        return
+    credits, points = contribution(snapshot[2], credits)
+    apply_delta(snapshot[0], -credits, -points)
+
+
+def snapshot_grade(grade):
+    """Remember the stored values so later saves can subtract them"""
+    values = grade.__dict__
+    grade._gpa_snapshot = (
+        values.get('student_id'), values.get('subject_id'), values.get('grade'), values.get('is_active', True)
+    )
@@ -0,0 +1,154 @@
+import codecs
+import csv
+import json
+from decimal import Decimal, InvalidOperation
+
+from django.db import transaction
+
+from .gpa import recompute as recompute_gpa
+from .models import Grade, Student
+
+FORMATS = ('csv', 'jsonl')
+
+
+def detect_format(filename, default='csv'):
+    """Guess the upload format from its file name"""
+    name = (filename or '').lower()
+    if name.endswith(('.jsonl', '.ndjson')):
+        return 'jsonl'
+    if name.endswith('.csv'):
+        return 'csv'
+    return default
+
+
+def iter_rows(lines, file_format):
+    """
+    Yield (line_number, row_dict) from an iterable of text lines.
+    Rows are parsed one at a time, so memory doesn't grow with the file size.
+    Malformed JSON lines yield (line_number, None).
+    """
+    if file_format == 'csv':
+        reader = csv.DictReader(lines)
+        for row in reader:
+            yield reader.line_num, row
+        return
+    for line_number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError:
+            row = None
+        yield line_number, row if isinstance(row, dict) else None
+
+
+def _parse_row(row):
+    """Return (student_id, subject_id, grade, notes) or raise ValueError with a message"""
+    if row is None:
+        raise ValueError('Malformed row')
+    try:
+        student_id = int(row.get('student_id'))
+        subject_id = int(row.get('subject_id'))
+    except (TypeError, ValueError):
+        raise ValueError('student_id and subject_id must be integers')
+    try:
+        grade = Decimal(str(row.get('grade')).strip())
+    except InvalidOperation:
+        raise ValueError('grade must be a number')
+    if not grade.is_finite() or not Decimal(0) <= grade <= Decimal(100):
+        raise ValueError('grade must be between 0 and 100')
+    return student_id, subject_id, grade.quantize(Decimal('0.01')), row.get('notes') or ''
+
+
+class GradeImporter:
+    """
+    Upserts grades for one professor in batches.
+    Each batch is checked with set queries (taught subjects, active students,
+    enrollments) and written with one bulk_create(update_conflicts=True) on
+    the (student, subject, professor) unique key.
+    """
+
+    def __init__(self, professor, batch_size=1000):
+        self.professor = professor
+        self.batch_size = batch_size
+        self.taught_subjects = set(professor.subjects.filter(is_active=True).values_list('id', flat=True))
+        self.imported = 0
+        self.errors = []
+
+    def run(self, rows):
+        """
+        Import (line_number, row) pairs and return the report.
+        Batches commit one at a time, so a file that stops decoding partway
+        is reported as a row error after the rows read so far are imported.
+        """
+        batch = []
+        line_number = 0
+        try:
+            for line_number, row in rows:
+                try:
+                    batch.append((line_number, _parse_row(row)))
+                except ValueError as exc:
+                    self.errors.append({'line': line_number, 'error': str(exc)})
+                if len(batch) >= self.batch_size:
+                    self._write_batch(batch)
+                    batch = []
+        except (UnicodeDecodeError, csv.Error) as exc:
+            self.errors.append({'line': line_number + 1, 'error': f'Could not read the file from here on: {exc}'})
+        if batch:
+            self._write_batch(batch)
+        return self.report()
+
+    def report(self):
+        return {'imported': self.imported, 'errors': sorted(self.errors, key=lambda error: error['line'])}
+
+    def _write_batch(self, batch):
+        student_ids = {parsed[0] for _, parsed in batch}
+        subject_ids = {parsed[1] for _, parsed in batch} & self.taught_subjects
+        active_students = set(
+            Student.objects.filter(id__in=student_ids, is_active=True).values_list('id', flat=True)
+        )
+        enrolled = set(
+            Student.subjects.through.objects.filter(student_id__in=active_students, subject_id__in=subject_ids)
+            .values_list('student_id', 'subject_id')
+        )
+
+        # Later rows for the same student/subject win
+        grades = {}
+        for line_number, (student_id, subject_id, grade, notes) in batch:
+            if subject_id not in self.taught_subjects:
+                error = 'You do not teach this subject'
+            elif student_id not in active_students:
+                error = 'Student not found'
+            elif (student_id, subject_id) not in enrolled:
+                error = 'Student is not enrolled in this subject'
+            else:
+                grades[(student_id, subject_id)] = Grade(
+                    student_id=student_id, subject_id=subject_id, professor=self.professor,
+                    grade=grade, notes=notes
+                )
+                continue
+            self.errors.append({'line': line_number, 'error': error})
+
+        with transaction.atomic():
+            Grade.objects.bulk_create(
+                list(grades.values()),
+                update_conflicts=True,
+                unique_fields=['student', 'subject', 'professor'],
+                # A re-imported soft-deleted grade becomes active again
+                update_fields=['grade', 'notes', 'is_active', 'updated_at'],
+            )
+            # bulk_create skips signals, so refresh the batch's GPAs in bulk
+            recompute_gpa({grade.student_id for grade in grades.values()})
+        self.imported += len(grades)
+
+
+def import_grades(professor, lines, file_format='csv', batch_size=1000):
+    """Stream-parse a CSV/JSONL grade file and upsert its rows; returns the report"""
+    if file_format not in FORMATS:
+        raise ValueError(f'Unsupported format: {file_format}')
+    return GradeImporter(professor, batch_size=batch_size).run(iter_rows(lines, file_format))
+
+
+def iter_file_lines(uploaded_file):
+    """Decode an uploaded file line by line as UTF-8 text (BOM tolerated)"""
+    return codecs.iterdecode(uploaded_file, 'utf-8-sig')
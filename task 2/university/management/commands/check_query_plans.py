@@ -0,0 +1,65 @@
+import re
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Count, Exists, OuterRef, Q, Subquery
+from django.utils import timezone
+
+from university.models import Grade, Professor, RefreshToken, RevokedToken, Student, Subject
+
+# `SCAN <table>` without `USING ... INDEX` is a full table scan in SQLite's EXPLAIN QUERY PLAN
+FULL_SCAN = re.compile(r'\bSCAN (\w+)(?: AS \w+)?\s*$')
+
+
+def hot_queries():
+    """(label, queryset) pairs mirroring the query shapes of the busiest views"""
+    enrollments = Student.subjects.through.objects
+    teaching = Professor.subjects.through.objects
+    return [
+        ('admin dashboard recent students',
+         Student.objects.filter(is_active=True).order_by('-created_at')[:5]),
+        ('course catalog', Subject.objects.filter(is_active=True).select_related('faculty').annotate(
+            is_enrolled=Exists(enrollments.filter(subject_id=OuterRef('pk'), student_id=1)))),
+        ('professor dashboard students', Student.objects.filter(
+            id__in=enrollments.filter(subject__professors=1).values('student_id'), is_active=True)
+         .order_by('created_at', 'id')),
+        ('taught subjects with enrollment counts', Subject.objects.filter(professors=1).annotate(
+            enrolled_count=Count('students', filter=Q(students__is_active=True)))),
+        ('gradebook', enrollments.filter(subject_id__in=[1, 2], student__is_active=True).annotate(
+            grade=Subquery(Grade.objects.filter(
+                student_id=OuterRef('student_id'), subject_id=OuterRef('subject_id'), professor_id=1
+            ).order_by().values('grade')[:1]))),
+        ('professors teaching a subject', teaching.filter(subject_id=1).values('professor_id')),
+        ('roster export', enrollments.filter(subject_id__in=[1], student__is_active=True)
+         .order_by('subject_id', 'student_id')),
+        ('grade export', Grade.objects.filter(is_active=True, subject_id__in=[1])
+         .order_by('subject_id', 'student_id', 'id')),
+        ('student grades', Grade.objects.filter(
+            student_id=1, professor_id=1, subject_id__in=teaching.filter(professor_id=1).values('subject_id'))),
+        ('GPA recompute for a subject', Grade.objects.filter(subject_id=1).values('student_id')),
+        ('refresh token eviction', RefreshToken.objects.filter(user_id=1).order_by('-created_at', '-id')),
+        ('expired refresh tokens', RefreshToken.objects.filter(expires_at__lt=timezone.now())),
+        ('revocation refresh', RevokedToken.objects.filter(id__gt=0)),
+    ]
+
+
+class Command(BaseCommand):
+    help = 'EXPLAIN the hot view queries and fail if any of them scans a whole table'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--verbose-plans', action='store_true', help='Print every query plan')
+
+    def handle(self, *args, **options):
+        failures = []
+        for label, queryset in hot_queries():
+            plan = queryset.explain()
+            scans = [match.group(1) for match in map(FULL_SCAN.search, plan.splitlines()) if match]
+            if scans:
+                failures.append(label)
+                self.stdout.write(self.style.ERROR(f"{label}: full scan of {', '.join(scans)}"))
+            else:
+                self.stdout.write(f'{label}: ok')
+            if options['verbose_plans'] or scans:
+                self.stdout.write(plan)
+        if failures:
+            raise CommandError(f'{len(failures)} queries scan whole tables')
+        self.stdout.write(self.style.SUCCESS('All hot queries use indexes'))
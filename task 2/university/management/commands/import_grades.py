@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from university.grade_import import FORMATS, detect_format, import_grades
+from university.models import Professor
+
+
+class Command(BaseCommand):
+    help = 'Bulk create/update grades from a CSV or JSON Lines file'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='CSV or JSONL file with student_id, subject_id, grade, notes')
+        parser.add_argument('--professor', required=True, help='Username of the grading professor')
+        parser.add_argument('--file-format', choices=FORMATS, help='Defaults to the file extension')
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        try:
+            professor = Professor.objects.get(user__username=options['professor'])
+        except Professor.DoesNotExist:
+            raise CommandError(f"Professor {options['professor']} not found")
+
+        file_format = options['file_format'] or detect_format(options['path'])
+        with open(options['path'], encoding='utf-8-sig', newline='') as lines:
+            report = import_grades(professor, lines, file_format=file_format, batch_size=options['batch_size'])
+
+        for error in report['errors']:
+            self.stderr.write(f"line {error['line']}: {error['error']}")
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {report['imported']} grades, {len(report['errors'])} rows rejected"
+        ))
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from university.models import RefreshToken, RevokedToken
+
+
+class Command(BaseCommand):
+    help = 'Delete expired refresh tokens and access-token revocations in batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000,
+                            help='Number of rows deleted per statement')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        deleted = RefreshToken.objects.purge_expired(batch_size=batch_size)
+        self.stdout.write(self.style.SUCCESS(f'Deleted {deleted} expired refresh tokens'))
+        deleted = RevokedToken.objects.purge_expired(batch_size=batch_size)
+        self.stdout.write(self.style.SUCCESS(f'Deleted {deleted} expired token revocations'))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from university.models import DashboardStats
+
+
+class Command(BaseCommand):
+    help = 'Recount the materialized admin dashboard counters from scratch'
+
+    def handle(self, *args, **options):
+        stats = DashboardStats.objects.rebuild()
+        self.stdout.write(self.style.SUCCESS(
+            f'Students: {stats.total_students}, professors: {stats.total_professors}, '
+            f'subjects: {stats.total_subjects}, faculties: {stats.total_faculties}'
+        ))
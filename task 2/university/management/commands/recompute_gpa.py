@@ -0,0 +1,61 @@
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from django.core.management.base import BaseCommand
+
+from university import gpa
+from university.database import setup_worker
+from university.models import Student
+
+
+def _chunks(ids, size):
+    for start in range(0, len(ids), size):
+        yield ids[start:start + size]
+
+
+class Command(BaseCommand):
+    help = 'Recompute every student GPA from grades in chunks, or check the stored values'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=1000)
+        parser.add_argument('--workers', type=int, default=1,
+                            help='Aggregate chunks in this many processes (writes stay in this process)')
+        parser.add_argument('--check', action='store_true',
+                            help='Only report students whose stored GPA totals are out of date')
+
+    def handle(self, *args, **options):
+        student_ids = list(Student.objects.order_by('id').values_list('id', flat=True))
+        chunks = list(_chunks(student_ids, options['chunk_size']))
+
+        if options['workers'] > 1:
+            # Spawned, not forked: children must not inherit this process's open SQLite connection
+            executor = ProcessPoolExecutor(
+                max_workers=options['workers'],
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=setup_worker,
+                initargs=(os.environ['DJANGO_SETTINGS_MODULE'],),
+            )
+            with executor:
+                results = executor.map(gpa.compute_totals, chunks)
+                mismatched = sum(self._process(totals, options['check']) for totals in results)
+        else:
+            mismatched = sum(self._process(gpa.compute_totals(chunk), options['check']) for chunk in chunks)
+
+        if options['check']:
+            self.stdout.write(f'{mismatched} of {len(student_ids)} students have out-of-date GPA totals')
+        else:
+            self.stdout.write(self.style.SUCCESS(
+                f'Recomputed GPA for {len(student_ids)} students ({mismatched} changed)'
+            ))
+
+    def _process(self, totals, check_only):
+        """Write a chunk of totals (unless checking) and return how many differed"""
+        stored = Student.objects.filter(id__in=list(totals)).values_list('id', 'gpa_credits', 'gpa_points', 'gpa')
+        mismatched = sum(
+            1 for student_id, credits, points, value in stored
+            if (credits, points, value) != (*totals[student_id], gpa.compute_gpa(*totals[student_id]))
+        )
+        if not check_only and mismatched:
+            gpa.write_totals(totals)
+        return mismatched
@@ -0,0 +1,34 @@
+import sqlite3
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from university.routers import replica_alias
+
+
+class Command(BaseCommand):
+    help = 'Copy the primary SQLite database onto the read replica file (online backup)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--pages', type=int, default=1024,
+                            help='Pages copied per step, so writers are not blocked for the whole copy')
+
+    def handle(self, *args, **options):
+        alias = replica_alias()
+        if alias is None:
+            raise CommandError('No read replica configured (READ_REPLICA_ALIAS)')
+        primary = settings.DATABASES[DEFAULT_DB_ALIAS]
+        replica = settings.DATABASES[alias]
+        if 'sqlite3' not in primary['ENGINE'] or 'sqlite3' not in replica['ENGINE']:
+            raise CommandError('sync_replica only copies between SQLite databases')
+
+        connections[alias].close()
+        source = sqlite3.connect(str(primary['NAME']))
+        target = sqlite3.connect(str(replica['NAME']))
+        try:
+            source.backup(target, pages=options['pages'])
+        finally:
+            target.close()
+            source.close()
+        self.stdout.write(self.style.SUCCESS(f"Copied {primary['NAME']} to {replica['NAME']}"))
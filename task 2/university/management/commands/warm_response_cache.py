@@ -0,0 +1,75 @@
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from university.caching import (
+    flush_response_cache_stats, get_response_cache, is_process_local, reset_response_cache_stats,
+    response_cache_stats,
+)
+from university.views import FacultyViewSet, SubjectViewSet
+
+# (URL prefix, ViewSet) pairs served through the response cache
+CACHED_ENDPOINTS = (
+    ('/api/faculties/', FacultyViewSet),
+    ('/api/subjects/', SubjectViewSet),
+)
+
+
+class Command(BaseCommand):
+    help = 'Fill the response cache for the catalog endpoints, or report its hit ratio'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--host', default=settings.ALLOWED_HOSTS[0] if settings.ALLOWED_HOSTS else 'localhost',
+                            help='Host the clients use; it is part of the cache key')
+        parser.add_argument('--insecure', action='store_true', help='Warm http:// instead of https:// URLs')
+        parser.add_argument('--max-pages', type=int, default=10, help='List pages to follow per endpoint')
+        parser.add_argument('--detail', action='store_true', help='Also warm every detail response')
+        parser.add_argument('--stats', action='store_true', help='Only print the hit ratio')
+        parser.add_argument('--reset-stats', action='store_true', help='Reset the hit/miss counters')
+
+    def handle(self, *args, **options):
+        cache = get_response_cache()
+        if cache is None:
+            raise CommandError('The response cache is disabled (RESPONSE_CACHE_ENABLED)')
+        if is_process_local(cache):
+            # Entries and counters would live and die with this command's process
+            raise CommandError(
+                f'The {settings.RESPONSE_CACHE_ALIAS!r} cache ({type(cache).__name__}) is per process; '
+                'configure a shared backend such as FileBasedCache'
+            )
+        if options['reset_stats']:
+            reset_response_cache_stats()
+        if options['stats'] or options['reset_stats']:
+            stats = response_cache_stats()
+            self.stdout.write(
+                f"hits: {stats['hits']}, misses: {stats['misses']}, hit ratio: {stats['hit_ratio']:.1%}"
+            )
+            return
+
+        factory = APIRequestFactory(
+            SERVER_NAME=options['host'], HTTP_HOST=options['host'], secure=not options['insecure']
+        )
+        # Any authenticated user sees the same catalog responses
+        user = User(username='cache-warmer', is_active=True)
+        warmed = 0
+        for prefix, viewset in CACHED_ENDPOINTS:
+            list_view = viewset.as_view({'get': 'list'})
+            detail_view = viewset.as_view({'get': 'retrieve'})
+            url = prefix
+            for _ in range(options['max_pages']):
+                request = factory.get(url, secure=not options['insecure'])
+                force_authenticate(request, user=user)
+                response = list_view(request)
+                warmed += 1
+                for item in response.data['results'] if options['detail'] else ():
+                    request = factory.get(f"{prefix}{item['id']}/", secure=not options['insecure'])
+                    force_authenticate(request, user=user)
+                    detail_view(request, pk=item['id'])
+                    warmed += 1
+                url = response.data.get('next')
+                if not url:
+                    break
+        # This process exits now, so publish its lookups instead of waiting for a full batch
+        flush_response_cache_stats()
+        self.stdout.write(self.style.SUCCESS(f'Warmed {warmed} responses'))
@@ -0,0 +1,63 @@
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.utils.decorators import sync_and_async_middleware
+
+from .routers import _read_from_replica, replica_alias
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+
+@sync_and_async_middleware
+class ReplicaRoutingMiddleware:
+    """
+    Serves safe requests to the views listed in READ_REPLICA_URL_NAMES from
+    the read replica. A successful write sets a short-lived cookie that pins
+    the client to the primary for READ_REPLICA_PIN_SECONDS, so users read
+    their own writes while the replica catches up.
+    Works in both sync and async chains, so async views under ASGI aren't
+    pushed onto a thread.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        token = _read_from_replica.set(False)
+        try:
+            response = self.get_response(request)
+        finally:
+            _read_from_replica.reset(token)
+        return self.pin_to_primary(request, response)
+
+    async def __acall__(self, request):
+        token = _read_from_replica.set(False)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _read_from_replica.reset(token)
+        return self.pin_to_primary(request, response)
+
+    def pin_to_primary(self, request, response):
+        if request.method not in SAFE_METHODS and response.status_code < 400 and replica_alias():
+            response.set_cookie(
+                settings.READ_REPLICA_PIN_COOKIE,
+                '1',
+                max_age=settings.READ_REPLICA_PIN_SECONDS,
+                httponly=True,
+                secure=True,
+                samesite='None',
+            )
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if (
+            request.method in SAFE_METHODS
+            and request.resolver_match.url_name in settings.READ_REPLICA_URL_NAMES
+            and settings.READ_REPLICA_PIN_COOKIE not in request.COOKIES
+        ):
+            _read_from_replica.set(True)
+        return None
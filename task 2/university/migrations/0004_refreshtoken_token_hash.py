@@ -0,0 +1,36 @@
+import hashlib
+
+from django.db import migrations, models
+
+
+def hash_existing_tokens(apps, schema_editor):
+    RefreshToken = apps.get_model('university', 'RefreshToken')
+    for token in RefreshToken.objects.all().iterator():
+        token.token_hash = hashlib.sha256(token.token_hash.encode('utf-8')).hexdigest()
+        token.save(update_fields=['token_hash'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('university', '0003_alter_refreshtoken_table_grade'),
+    ]
+
+    operations = [
+        migrations.RenameField(
+            model_name='refreshtoken',
+            old_name='token',
+            new_name='token_hash',
+        ),
+        migrations.RunPython(hash_existing_tokens, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='refreshtoken',
+            name='token_hash',
+            field=models.CharField(max_length=64, unique=True),
+        ),
+        migrations.AlterField(
+            model_name='refreshtoken',
+            name='expires_at',
+            field=models.DateTimeField(db_index=True),
+        ),
+    ]
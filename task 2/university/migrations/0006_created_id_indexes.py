@@ -0,0 +1,40 @@
+# Generated by Django 5.2.9 on 2026-10-16 22:47
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('university', '0005_revokedtoken'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='administrator',
+            index=models.Index(fields=['created_at', 'id'], name='administrator_created_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='faculty',
+            index=models.Index(fields=['created_at', 'id'], name='faculty_created_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='professor',
+            index=models.Index(fields=['created_at', 'id'], name='professor_created_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='student',
+            index=models.Index(fields=['created_at', 'id'], name='student_created_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='subject',
+            index=models.Index(fields=['created_at', 'id'], name='subject_created_id_idx'),
+        ),
+        # auth.User belongs to another app, so its keyset index is created directly
+        migrations.RunSQL(
+            sql='CREATE INDEX university_user_joined_id_idx ON auth_user (date_joined, id)',
+            reverse_sql='DROP INDEX university_user_joined_id_idx',
+        ),
+    ]
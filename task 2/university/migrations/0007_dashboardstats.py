@@ -0,0 +1,27 @@
+# Generated by Django 5.2.9 on 2026-10-16 22:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('university', '0006_created_id_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DashboardStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('total_students', models.PositiveIntegerField(default=0)),
+                ('total_professors', models.PositiveIntegerField(default=0)),
+                ('total_subjects', models.PositiveIntegerField(default=0)),
+                ('total_faculties', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name_plural': 'Dashboard stats',
+            },
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.9 on 2026-10-16 22:57
+
+from django.db import migrations, models
+
+from university import gpa
+
+BACKFILL_CHUNK_SIZE = 1000
+
+
+def backfill_gpa_totals(apps, schema_editor):
+    """Start the running totals from the existing grades, so later deltas apply to real sums"""
+    Student = apps.get_model('university', 'Student')
+    Grade = apps.get_model('university', 'Grade')
+    student_ids = list(Student.objects.order_by('id').values_list('id', flat=True))
+    for start in range(0, len(student_ids), BACKFILL_CHUNK_SIZE):
+        chunk = student_ids[start:start + BACKFILL_CHUNK_SIZE]
+        gpa.write_totals(gpa.compute_totals(chunk, grade_model=Grade), student_model=Student)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('university', '0007_dashboardstats'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='student',
+            name='gpa_credits',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='student',
+            name='gpa_points',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=8),
+        ),
+        migrations.RunPython(backfill_gpa_totals, migrations.RunPython.noop),
+    ]
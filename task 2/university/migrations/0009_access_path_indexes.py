@@ -0,0 +1,41 @@
+# Generated by Django 5.2.9 on 2026-10-16 23:14
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('university', '0008_student_gpa_totals'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='grade',
+            index=models.Index(fields=['subject', 'student'], name='grade_subject_student_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='refreshtoken',
+            index=models.Index(fields=['user', 'created_at'], name='refreshtoken_user_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='student',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['created_at', 'id'], name='student_active_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='subject',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['created_at', 'id'], name='subject_active_idx'),
+        ),
+        # Auto-created M2M tables only index (owner, subject); reads by subject go the other way
+        migrations.RunSQL(
+            sql='CREATE INDEX student_subjects_subject_student_idx ON university_student_subjects (subject_id, student_id)',
+            reverse_sql='DROP INDEX student_subjects_subject_student_idx',
+        ),
+        migrations.RunSQL(
+            sql='CREATE INDEX professor_subjects_subject_professor_idx '
+                'ON university_professor_subjects (subject_id, professor_id)',
+            reverse_sql='DROP INDEX professor_subjects_subject_professor_idx',
+        ),
+    ]
@@ -1,5 +1,11 @@
+import hashlib
+import secrets
+from datetime import timedelta
+
 from django.db import models
+from django.conf import settings
 from django.contrib.auth.models import User
+from django.utils import timezone
 
 # Base class for common fields (DRY principle)
 class BaseModel(models.Model):
@@ -27,6 +33,7 @@ class Faculty(BaseModel):
     
     class Meta:
         verbose_name_plural = "Faculties"
+        indexes = [models.Index(fields=['created_at', 'id'], name='faculty_created_id_idx')]
 
 
 # Subject Model
@@ -40,6 +47,21 @@ class Subject(BaseModel):
     def __str__(self):
         return f"{self.code} - {self.name}"
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['created_at', 'id'], name='subject_created_id_idx'),
+            # Catalogs and counters only ever read active subjects
+            models.Index(fields=['created_at', 'id'], condition=models.Q(is_active=True), name='subject_active_idx'),
+        ]
+
+
+class ProfileQuerySet(models.QuerySet):
+    def with_related(self):
+        """Join user and faculty and prefetch subjects with their faculties"""
+        return self.select_related('user', 'faculty').prefetch_related(
+            models.Prefetch('subjects', queryset=Subject.objects.select_related('faculty'))
+        )
+
 
 # Administrator Model
 class Administrator(BaseModel):
@@ -50,6 +72,9 @@ class Administrator(BaseModel):
     def __str__(self):
         return f"Admin - {self.user.get_full_name() or self.user.username}"
 
+    class Meta:
+        indexes = [models.Index(fields=['created_at', 'id'], name='administrator_created_id_idx')]
+
 
 # Professor Model
 class Professor(BaseModel):
@@ -59,10 +84,15 @@ class Professor(BaseModel):
     phone = models.CharField(max_length=15, blank=True)
     office_hours = models.CharField(max_length=100, blank=True)
     subjects = models.ManyToManyField(Subject, related_name='professors', blank=True)
+
+    objects = ProfileQuerySet.as_manager()
     
     def __str__(self):
         return f"Prof. {self.user.get_full_name() or self.user.username}"
 
+    class Meta:
+        indexes = [models.Index(fields=['created_at', 'id'], name='professor_created_id_idx')]
+
 
 # Student Model
 class Student(BaseModel):
@@ -73,10 +103,21 @@ class Student(BaseModel):
     phone = models.CharField(max_length=15, blank=True)
     subjects = models.ManyToManyField(Subject, related_name='students', blank=True)
     gpa = models.DecimalField(max_digits=3, decimal_places=2, default=0.00)
+    # Running sums maintained by university.gpa whenever grades change
+    gpa_credits = models.PositiveIntegerField(default=0)
+    gpa_points = models.DecimalField(max_digits=8, decimal_places=2, default=0)
+
+    objects = ProfileQuerySet.as_manager()
     
     def __str__(self):
         return f"{self.user.get_full_name() or self.user.username} - {self.enrollment_number}"
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['created_at', 'id'], name='student_created_id_idx'),
+            models.Index(fields=['created_at', 'id'], condition=models.Q(is_active=True), name='student_active_idx'),
+        ]
+
 
 # Grade Model - for storing student grades per subject
 class Grade(BaseModel):
@@ -89,20 +130,140 @@ class Grade(BaseModel):
     class Meta:
         unique_together = ['student', 'subject', 'professor']
         ordering = ['-created_at']
+        # (student, subject) lookups use the unique index; this serves per-subject scans
+        indexes = [models.Index(fields=['subject', 'student'], name='grade_subject_student_idx')]
     
     def __str__(self):
         return f"{self.student.user.username} - {self.subject.code}: {self.grade}"
 
 
+# Dashboard Stats Model - materialized counters for the admin dashboard
+class DashboardStatsManager(models.Manager):
+    STATS_ID = 1
+
+    def current(self):
+        """Return the counters row, rebuilding it when it doesn't exist yet"""
+        try:
+            return self.get(pk=self.STATS_ID)
+        except self.model.DoesNotExist:
+            return self.rebuild()
+
+    def rebuild(self):
+        """Recount every counter from the source tables"""
+        counts = {
+            field: model.objects.filter(is_active=True).count()
+            for model, field in self.model.counted_models().items()
+        }
+        stats, _ = self.update_or_create(pk=self.STATS_ID, defaults=counts)
+        return stats
+
+    def adjust(self, field, delta):
+        """Apply an incremental change to one counter"""
+        updated = self.filter(pk=self.STATS_ID).update(
+            **{field: models.F(field) + delta, 'updated_at': timezone.now()}
+        )
+        if not updated:
+            self.rebuild()
+
+
+class DashboardStats(models.Model):
+    total_students = models.PositiveIntegerField(default=0)
+    total_professors = models.PositiveIntegerField(default=0)
+    total_subjects = models.PositiveIntegerField(default=0)
+    total_faculties = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = DashboardStatsManager()
+
+    @staticmethod
+    def counted_models():
+        """Models counted on the dashboard, mapped to their counter field"""
+        return {
+            Student: 'total_students',
+            Professor: 'total_professors',
+            Subject: 'total_subjects',
+            Faculty: 'total_faculties',
+        }
+
+    def __str__(self):
+        return f"Dashboard stats (updated: {self.updated_at})"
+
+    class Meta:
+        verbose_name_plural = "Dashboard stats"
+
+
 # Refresh Token Model
+def hash_token(token):
+    """Fixed-length digest used to store and look up refresh tokens"""
+    return hashlib.sha256(token.encode('utf-8')).hexdigest()
+
+
+class ExpiringTokenManager(models.Manager):
+    def purge_expired(self, batch_size=1000):
+        """Delete expired rows in batches and return how many were removed"""
+        now = timezone.now()
+        deleted = 0
+        while True:
+            ids = list(self.filter(expires_at__lt=now).values_list('id', flat=True)[:batch_size])
+            if not ids:
+                return deleted
+            deleted += self.filter(id__in=ids).delete()[0]
+
+
+class RefreshTokenManager(ExpiringTokenManager):
+    def issue(self, user):
+        """Create a refresh token for the user and return the raw value"""
+        token = secrets.token_urlsafe(64)
+        now = timezone.now()
+        self.create(
+            token_hash=hash_token(token),
+            user=user,
+            expires_at=now + timedelta(days=settings.JWT_REFRESH_EXPIRATION_DELTA_DAYS)
+        )
+        self.evict_for_user(user, now)
+        return token
+
+    def evict_for_user(self, user, now=None):
+        """Drop the user's expired tokens and the oldest ones beyond the per-user cap"""
+        now = now or timezone.now()
+        tokens = self.filter(user=user)
+        tokens.filter(expires_at__lt=now).delete()
+        cap = settings.JWT_REFRESH_TOKENS_PER_USER
+        stale_ids = list(tokens.order_by('-created_at', '-id').values_list('id', flat=True)[cap:])
+        if stale_ids:
+            self.filter(id__in=stale_ids).delete()
+
+    def get_by_token(self, token):
+        """Look up a refresh token by its raw value"""
+        return self.select_related('user').get(token_hash=hash_token(token))
+
+    def revoke(self, token):
+        """Delete a refresh token by its raw value"""
+        return self.filter(token_hash=hash_token(token)).delete()
+
 class RefreshToken(models.Model):
-    token = models.CharField(max_length=256, unique=True)
+    token_hash = models.CharField(max_length=64, unique=True)
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='refresh_tokens')
-    expires_at = models.DateTimeField()
+    expires_at = models.DateTimeField(db_index=True)
     created_at = models.DateTimeField(auto_now_add=True)
+
+    objects = RefreshTokenManager()
     
     def __str__(self):
         return f"RefreshToken for {self.user.username} (expires: {self.expires_at})"
     
     class Meta:
         db_table = 'university_refreshtoken'
+        indexes = [models.Index(fields=['user', 'created_at'], name='refreshtoken_user_created_idx')]
+
+
+# Revoked Access Token Model - rows expire together with the revoked token
+class RevokedToken(models.Model):
+    jti = models.CharField(max_length=64, unique=True)
+    expires_at = models.DateTimeField(db_index=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    objects = ExpiringTokenManager()
+
+    def __str__(self):
+        return f"Revoked {self.jti} (expires: {self.expires_at})"
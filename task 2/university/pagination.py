@@ -0,0 +1,18 @@
+from rest_framework.pagination import CursorPagination
+
+
+class CreatedAtCursorPagination(CursorPagination):
+    """
+    Keyset pagination ordered by (created_at, id).
+    Pages are fetched with an indexed range query, so their cost doesn't grow
+    with the page number and rows inserted meanwhile don't shift later pages.
+    Clients can choose the page size with `?page_size=`, up to max_page_size.
+    """
+    ordering = ('created_at', 'id')
+    page_size_query_param = 'page_size'
+    max_page_size = 1000
+
+
+class UserCursorPagination(CreatedAtCursorPagination):
+    """Keyset pagination for auth users, ordered by (date_joined, id)"""
+    ordering = ('date_joined', 'id')
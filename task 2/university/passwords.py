@@ -0,0 +1,54 @@
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth.hashers import PBKDF2PasswordHasher, make_password, verify_password
+
+from .database import setup_worker
+
+
+class TunablePBKDF2PasswordHasher(PBKDF2PasswordHasher):
+    """
+    PBKDF2 hasher whose work factor comes from settings.PASSWORD_HASH_ITERATIONS.
+    Stored hashes with a different iteration count are upgraded on the next login.
+    """
+
+    @property
+    def iterations(self):
+        return getattr(settings, 'PASSWORD_HASH_ITERATIONS', PBKDF2PasswordHasher.iterations)
+
+
+def check_and_upgrade(password, encoded):
+    """
+    Verify a password against its stored hash.
+    Returns (is_correct, new_encoded) where new_encoded is set when the hash
+    must be re-encoded with the current work factor.
+    """
+    is_correct, must_update = verify_password(password, encoded)
+    if is_correct and must_update:
+        return True, make_password(password)
+    return is_correct, None
+
+
+_pool = None
+
+
+def get_hashing_pool():
+    """Return the bounded process pool used for password verification"""
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(
+            max_workers=settings.LOGIN_HASH_WORKERS,
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=setup_worker,
+            initargs=(os.environ.get('DJANGO_SETTINGS_MODULE', 'university_project.settings'),),
+        )
+    return _pool
+
+
+async def acheck_and_upgrade(password, encoded):
+    """Run check_and_upgrade in the hashing pool without blocking the event loop"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_hashing_pool(), check_and_upgrade, password, encoded)
@@ -1,25 +1,97 @@
+from django.core.exceptions import ObjectDoesNotExist
+from django.db.models import CharField, Case, Value, When
 from rest_framework.permissions import BasePermission
 
 
+def get_user_role(user):
+    """Determine user role"""
+    if hasattr(user, 'administrator'):
+        return 'admin'
+    elif hasattr(user, 'professor'):
+        return 'professor'
+    elif hasattr(user, 'student'):
+        return 'student'
+    return 'user'
+
+
+ROLES = ('admin', 'professor', 'student', 'user')
+
+
+def role_expression():
+    """SQL expression computing get_user_role() for User querysets, with the same precedence"""
+    return Case(
+        When(administrator__isnull=False, then=Value('admin')),
+        When(professor__isnull=False, then=Value('professor')),
+        When(student__isnull=False, then=Value('student')),
+        default=Value('user'),
+        output_field=CharField(),
+    )
+
+
+PROFILE_ATTRS = {
+    'admin': 'administrator',
+    'professor': 'professor',
+    'student': 'student',
+}
+
+
+def get_request_role(request):
+    """
+    Role of the caller for this request.
+    Uses the verified JWT `role` claim when present, otherwise probes the
+    profiles once and remembers the result on the request user.
+    """
+    user = request.user
+    role = getattr(user, 'role', None)
+    if role is None:
+        role = get_user_role(user)
+        user.role = role
+    return role
+
+
+def has_profile(request, role):
+    """
+    Whether the caller has the profile row for `role`. Users can hold several
+    profiles, so permissions check the row itself, not the single role claim.
+    Authenticated users are loaded with their profiles joined, so this runs no query.
+    """
+    return hasattr(request.user, PROFILE_ATTRS[role])
+
+
+def get_request_profile(request, role=None):
+    """
+    Profile row (Administrator, Professor or Student) for `role`, by default
+    the caller's role. Returns None when the profile is missing.
+    """
+    user = request.user
+    attr = PROFILE_ATTRS.get(role or get_request_role(request))
+    if attr is None:
+        return None
+    try:
+        return getattr(user, attr)
+    except ObjectDoesNotExist:
+        return None
+
+
 class IsAdmin(BasePermission):
     """Only admin users can access."""
     def has_permission(self, request, view):
-        return hasattr(request.user, 'administrator')
+        return has_profile(request, 'admin')
 
 
 class IsProfessor(BasePermission):
     """Only professor users can access."""
     def has_permission(self, request, view):
-        return hasattr(request.user, 'professor')
+        return has_profile(request, 'professor')
 
 
 class IsStudent(BasePermission):
     """Only student users can access."""
     def has_permission(self, request, view):
-        return hasattr(request.user, 'student')
+        return has_profile(request, 'student')
 
 
 class IsAdminOrProfessor(BasePermission):
     """Admin or professor can access."""
     def has_permission(self, request, view):
-        return hasattr(request.user, 'administrator') or hasattr(request.user, 'professor')
+        return has_profile(request, 'admin') or has_profile(request, 'professor')
@@ -0,0 +1,136 @@
+from operator import attrgetter
+
+from rest_framework.response import Response
+
+from .models import Professor, Student, Subject
+from .serializers import ProfessorSerializer, StudentSerializer
+
+USER_COLUMNS = ('user_id', 'user__username', 'user__email', 'user__first_name', 'user__last_name')
+
+SUBJECT_COLUMNS = ('id', 'name', 'code', 'description', 'faculty_id', 'faculty__name', 'credits', 'is_active')
+
+
+def subject_map(subject_ids):
+    """{subject id: SubjectSerializer-shaped dict} for `subject_ids`, from one joined query"""
+    rows = Subject.objects.filter(id__in=subject_ids).order_by().values_list(*SUBJECT_COLUMNS)
+    return {
+        subject_id: {
+            'id': subject_id, 'name': name, 'code': code, 'description': description, 'faculty': faculty_id,
+            'faculty_name': faculty_name, 'credits': credits, 'is_active': is_active,
+        }
+        for subject_id, name, code, description, faculty_id, faculty_name, credits, is_active in rows
+    }
+
+
+class ProfileValuesSerializer:
+    """
+    Read-only, values()-based counterpart of a profile ModelSerializer
+    (nested user, faculty name and subjects) for large lists. Profiles come
+    from QuerySet.values_list() rows and subjects from the M2M through table,
+    joined in Python with a subject map that every row shares, so no model
+    instances or DRF fields are built per row. The output matches
+    `serializer_class` exactly, keys in its Meta.fields order.
+    """
+    model = None
+    serializer_class = None
+    # Profile columns besides the shared id, user, faculty and is_active ones
+    columns = ()
+    # Columns whose JSON form isn't the raw value, rendered by serializer_class's field
+    converted = ()
+    # Output fields read from a differently named column
+    sources = {'faculty': 'faculty_id', 'faculty_name': 'faculty__name'}
+
+    def __init__(self, instance):
+        self.instance = instance
+        self.fields = [(name, self.field_getter(name)) for name in self.serializer_class.Meta.fields]
+
+    @classmethod
+    def rows(cls, queryset):
+        """Named values_list() rows of `queryset`, including created_at for cursor pagination"""
+        return queryset.prefetch_related(None).values_list(
+            'id', *USER_COLUMNS, 'faculty_id', 'faculty__name', *cls.columns, 'is_active', 'created_at', named=True
+        )
+
+    @classmethod
+    def representation(cls, name):
+        """to_representation of `serializer_class`'s field, for values whose JSON form isn't the raw value"""
+        return cls.serializer_class().fields[name].to_representation
+
+    def subjects_by_profile(self, profile_ids):
+        through = self.model.subjects.through
+        owner = self.model._meta.model_name + '_id'
+        links = through.objects.filter(**{owner + '__in': profile_ids}).values_list(owner, 'subject_id')
+        subjects = {}
+        for profile_id, subject_id in links:
+            subjects.setdefault(profile_id, []).append(subject_id)
+        shared = subject_map({subject_id for ids in subjects.values() for subject_id in ids})
+        return {profile_id: [shared[subject_id] for subject_id in ids] for profile_id, ids in subjects.items()}
+
+    @property
+    def data(self):
+        rows = list(self.instance)
+        subjects = self.subjects_by_profile([row.id for row in rows]) if rows else {}
+        return [self.to_representation(row, subjects.get(row.id, [])) for row in rows]
+
+    @staticmethod
+    def user(row):
+        return {
+            'id': row.user_id, 'username': row.user__username, 'email': row.user__email,
+            'first_name': row.user__first_name, 'last_name': row.user__last_name,
+        }
+
+    def field_getter(self, name):
+        """row -> the value of output field `name` (subjects are filled in by to_representation)"""
+        if name == 'user':
+            return self.user
+        if name == 'subjects':
+            return lambda row: None
+        get = attrgetter(self.sources.get(name, name))
+        if name in self.converted:
+            convert = self.representation(name)
+
+            def get_converted(row):
+                value = get(row)
+                return None if value is None else convert(value)
+            return get_converted
+        return get
+
+    def to_representation(self, row, subjects):
+        data = {name: get(row) for name, get in self.fields}
+        data['subjects'] = subjects
+        # Like the ModelSerializer, faculty_name is left out when there is no faculty
+        if row.faculty_id is None:
+            data.pop('faculty_name', None)
+        return data
+
+
+class StudentValuesSerializer(ProfileValuesSerializer):
+    model = Student
+    serializer_class = StudentSerializer
+    columns = ('enrollment_number', 'date_of_birth', 'phone', 'gpa')
+    converted = ('date_of_birth', 'gpa')
+
+
+class ProfessorValuesSerializer(ProfileValuesSerializer):
+    model = Professor
+    serializer_class = ProfessorSerializer
+    columns = ('specialization', 'phone', 'office_hours')
+
+
+class ValuesListMixin:
+    """
+    ViewSet mixin serving `list` with `values_serializer_class` (a
+    ProfileValuesSerializer) instead of the ModelSerializer. Other actions
+    are unchanged; leave it as None to keep the ModelSerializer.
+    """
+    values_serializer_class = None
+
+    def list(self, request, *args, **kwargs):
+        values_serializer = self.values_serializer_class
+        if values_serializer is None:
+            return super().list(request, *args, **kwargs)
+        rows = values_serializer.rows(self.filter_queryset(self.get_queryset()))
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(values_serializer(page).data)
+        return Response(values_serializer(rows).data)
@@ -0,0 +1,131 @@
+import datetime
+import decimal
+import re
+import uuid
+
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.utils import encoders
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+
+def _datetime(value):
+    representation = value.isoformat()
+    if representation.endswith('+00:00'):
+        representation = representation[:-6] + 'Z'
+    return representation
+
+
+def _time(value):
+    if value.utcoffset() is not None:
+        raise ValueError("JSON can't represent timezone-aware times.")
+    return value.isoformat()
+
+
+# Exact type -> JSON-native value, the same conversions as DRF's JSONEncoder.
+# One dict lookup replaces its chain of isinstance checks; subclasses and
+# rarer types (lazy strings, querysets, iterables) still go through DRF.
+TYPE_DISPATCH = {
+    datetime.datetime: _datetime,
+    datetime.date: datetime.date.isoformat,
+    datetime.time: _time,
+    datetime.timedelta: lambda value: str(value.total_seconds()),
+    decimal.Decimal: float,
+    uuid.UUID: str,
+    bytes: bytes.decode,
+}
+
+
+class FastJSONEncoder(encoders.JSONEncoder):
+    """DRF's JSONEncoder with an exact-type dispatch table in front of it"""
+
+    def default(self, obj):
+        convert = TYPE_DISPATCH.get(type(obj))
+        if convert is not None:
+            return convert(obj)
+        return super().default(obj)
+
+
+_fallback_encoder = FastJSONEncoder()
+
+
+def _default(obj):
+    convert = TYPE_DISPATCH.get(type(obj))
+    if convert is not None:
+        return convert(obj)
+    return _fallback_encoder.default(obj)
+
+
+if orjson is not None:
+    # Datetimes and dataclasses go through _default so they match DRF's output;
+    # non-string keys make orjson raise, which falls back to the stdlib encoder
+    ORJSON_OPTIONS = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS
+
+# Float tokens in orjson's output (a fraction or an exponent ending a value).
+# orjson and Python format some floats differently (0.00001 vs 1e-05), so
+# payloads with floats use the stdlib encoder. Both patterns start with a
+# literal so the scan stays cheap; matches inside strings only cost a fallback.
+_FLOAT_FRACTION = re.compile(rb'\.\d+(?=[,}\]]|\Z)')
+_FLOAT_EXPONENT = re.compile(rb'e-?\d+(?=[,}\]]|\Z)')
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    Compact JSON renderer producing byte-for-byte the same output as DRF's
+    JSONRenderer. Encodes with orjson when it is installed, falling back to
+    the stdlib encoder (with the dispatch table) for indented output, floats,
+    integers beyond 64 bits and anything orjson rejects. The one difference:
+    NaN/Infinity render as null instead of raising.
+    """
+    encoder_class = FastJSONEncoder
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        if (
+            orjson is None or not self.compact or self.ensure_ascii
+            or self.get_indent(accepted_media_type, renderer_context or {})
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            ret = orjson.dumps(data, default=_default, option=ORJSON_OPTIONS)
+        except TypeError:
+            return super().render(data, accepted_media_type, renderer_context)
+        if _FLOAT_FRACTION.search(ret) or _FLOAT_EXPONENT.search(ret):
+            return super().render(data, accepted_media_type, renderer_context)
+        # Escape the line/paragraph separators like JSONRenderer, for JSONP-safe output
+        return ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+
+
+class MessagePackRenderer(BaseRenderer):
+    """MessagePack for clients sending `Accept: application/msgpack` (needs the msgpack package)"""
+    media_type = 'application/msgpack'
+    format = 'msgpack'
+    charset = None
+    render_style = 'binary'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return msgpack.packb(data, default=_default, use_bin_type=True)
+
+
+class MessagePackParser(BaseParser):
+    """Parses `Content-Type: application/msgpack` request bodies (needs the msgpack package)"""
+    media_type = 'application/msgpack'
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        try:
+            return msgpack.unpackb(stream.read(), raw=False)
+        except (ValueError, msgpack.UnpackException) as exc:
+            raise ParseError('MessagePack parse error - %s' % str(exc))
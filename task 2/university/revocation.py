@@ -0,0 +1,77 @@
+import threading
+import time
+from datetime import datetime, timezone as dt_timezone
+
+from django.conf import settings
+
+from .models import RevokedToken
+
+
+class RevocationList:
+    """
+    In-process set of revoked access-token ids (`jti` -> `exp` timestamp).
+    Membership checks are dict lookups; the set is refreshed incrementally
+    from the RevokedToken table at most every `refresh_interval` seconds,
+    and entries are dropped once the revoked token would have expired anyway.
+    """
+
+    def __init__(self, refresh_interval=5):
+        self.refresh_interval = refresh_interval
+        self._entries = {}
+        self._last_id = 0
+        self._next_refresh = 0.0
+        self._lock = threading.Lock()
+
+    def is_revoked(self, jti):
+        if time.monotonic() >= self._next_refresh:
+            self.refresh()
+        exp = self._entries.get(jti)
+        return exp is not None and exp > time.time()
+
+    def add(self, jti, exp):
+        with self._lock:
+            self._entries[jti] = exp
+
+    def refresh(self):
+        """Load revocations added since the last refresh and prune expired ones"""
+        with self._lock:
+            if time.monotonic() < self._next_refresh:
+                return
+            rows = RevokedToken.objects.filter(id__gt=self._last_id).values_list('id', 'jti', 'expires_at')
+            now = time.time()
+            for row_id, jti, expires_at in rows.iterator():
+                self._last_id = max(self._last_id, row_id)
+                exp = expires_at.timestamp()
+                if exp > now:
+                    self._entries[jti] = exp
+            self._entries = {jti: exp for jti, exp in self._entries.items() if exp > now}
+            self._next_refresh = time.monotonic() + self.refresh_interval
+
+
+_revocation_list = None
+
+
+def get_revocation_list():
+    global _revocation_list
+    if _revocation_list is None:
+        _revocation_list = RevocationList(settings.JWT_REVOCATION_REFRESH_SECONDS)
+    return _revocation_list
+
+
+def is_revoked(payload):
+    """Check a verified token payload against the revocation list"""
+    jti = payload.get('jti')
+    return jti is not None and get_revocation_list().is_revoked(jti)
+
+
+def revoke(payload):
+    """Revoke an access token until its `exp` passes"""
+    jti = payload.get('jti')
+    exp = payload.get('exp')
+    if not jti or not exp or exp <= time.time():
+        return
+    RevokedToken.objects.get_or_create(
+        jti=jti, defaults={'expires_at': datetime.fromtimestamp(exp, tz=dt_timezone.utc)}
+    )
+    # Other workers pick the row up on their next refresh
+    get_revocation_list().add(jti, exp)
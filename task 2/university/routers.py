@@ -0,0 +1,43 @@
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+# Set per request by ReplicaRoutingMiddleware; False means every read goes to the primary
+_read_from_replica = ContextVar('read_from_replica', default=False)
+
+
+def replica_alias():
+    """Configured read replica alias, or None when no replica is set up"""
+    alias = getattr(settings, 'READ_REPLICA_ALIAS', None)
+    return alias if alias in settings.DATABASES else None
+
+
+def reading_from_replica():
+    """True while the current request's reads go to a configured replica"""
+    return _read_from_replica.get() and replica_alias() is not None
+
+
+class ReplicaRouter:
+    """
+    Sends reads to the read replica while ReplicaRoutingMiddleware allows it
+    and everything else to the primary. Models that must never be stale (token
+    revocations, refresh tokens) are always read from the primary.
+    """
+    primary_only_models = {'university.refreshtoken', 'university.revokedtoken'}
+
+    def db_for_read(self, model, **hints):
+        if not _read_from_replica.get() or model._meta.label_lower in self.primary_only_models:
+            return DEFAULT_DB_ALIAS
+        return replica_alias() or DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # The replica is a copy of the primary, so objects from either can be related
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # The replica gets its schema from the primary through sync_replica
+        return db != replica_alias()
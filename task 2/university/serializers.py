@@ -24,6 +24,14 @@ class SubjectSerializer(serializers.ModelSerializer):
         fields = ('id', 'name', 'code', 'description', 'faculty', 'faculty_name', 'credits', 'is_active')
 
 
+class CourseSerializer(SubjectSerializer):
+    """Subject with the caller's enrollment flag (annotated on the queryset)"""
+    is_enrolled = serializers.BooleanField(read_only=True)
+
+    class Meta(SubjectSerializer.Meta):
+        fields = SubjectSerializer.Meta.fields + ('is_enrolled',)
+
+
 class AdministratorSerializer(serializers.ModelSerializer):
     user = UserSerializer(read_only=True)
 
@@ -50,6 +58,8 @@ class StudentSerializer(serializers.ModelSerializer):
     class Meta:
         model = Student
         fields = ('id', 'user', 'enrollment_number', 'faculty', 'faculty_name', 'date_of_birth', 'phone', 'subjects', 'gpa', 'is_active')
+        # Maintained from grades (see gpa.py), never set directly
+        read_only_fields = ('gpa',)
 
 
 class DashboardAdminSerializer(serializers.Serializer):
@@ -69,6 +79,28 @@ class DashboardProfessorSerializer(serializers.Serializer):
     students_count = serializers.IntegerField()
 
 
+class TaughtSubjectSerializer(SubjectSerializer):
+    """Subject with its active enrollment count (annotated on the queryset)"""
+    enrolled_count = serializers.IntegerField(read_only=True)
+
+    class Meta(SubjectSerializer.Meta):
+        fields = SubjectSerializer.Meta.fields + ('enrolled_count',)
+
+
+class StudentSummarySerializer(serializers.ModelSerializer):
+    """Slim student row for paginated dashboard listings"""
+    username = serializers.CharField(source='user.username', read_only=True)
+    first_name = serializers.CharField(source='user.first_name', read_only=True)
+    last_name = serializers.CharField(source='user.last_name', read_only=True)
+    email = serializers.CharField(source='user.email', read_only=True)
+    faculty_name = serializers.CharField(source='faculty.name', read_only=True)
+
+    class Meta:
+        model = Student
+        fields = ('id', 'enrollment_number', 'username', 'first_name', 'last_name', 'email',
+                  'faculty_name', 'gpa', 'phone')
+
+
 class DashboardStudentSerializer(serializers.Serializer):
     """Serializer for student dashboard data"""
     student = StudentSerializer()
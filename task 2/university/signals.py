@@ -0,0 +1,103 @@
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_init, post_save
+from django.dispatch import receiver
+
+from . import gpa
+from .caching import bump_model_version, invalidate_user
+from .models import Administrator, DashboardStats, Faculty, Grade, Professor, Student, Subject
+
+
+def _invalidate_user_now_and_on_commit(user_id):
+    # Until the change commits, a concurrent request in this process can still
+    # read the old row and cache it again, so drop the entry once more after commit.
+    invalidate_user(user_id)
+    transaction.on_commit(lambda: invalidate_user(user_id))
+
+
+@receiver([post_save, post_delete], sender=User)
+def invalidate_cached_user(sender, instance, **kwargs):
+    """Drop the cached user whenever the account changes"""
+    _invalidate_user_now_and_on_commit(instance.pk)
+    # auth_user has no updated_at, so conditional GET validators use this version
+    transaction.on_commit(lambda: bump_model_version('auth.User'))
+
+
+@receiver([post_save, post_delete], sender=Administrator)
+@receiver([post_save, post_delete], sender=Professor)
+@receiver([post_save, post_delete], sender=Student)
+def invalidate_cached_profile(sender, instance, **kwargs):
+    """Drop the cached user whenever one of its role profiles changes"""
+    _invalidate_user_now_and_on_commit(instance.user_id)
+
+
+# Dashboard counters: only active rows are counted, so track is_active flips.
+def _track_active(sender, instance, **kwargs):
+    instance._counted_active = instance.is_active
+
+
+def _count_saved(sender, instance, created, **kwargs):
+    was_active = False if created else instance._counted_active
+    if instance.is_active != was_active:
+        field = DashboardStats.counted_models()[sender]
+        DashboardStats.objects.adjust(field, 1 if instance.is_active else -1)
+    instance._counted_active = instance.is_active
+
+
+def _count_deleted(sender, instance, **kwargs):
+    if instance._counted_active:
+        DashboardStats.objects.adjust(DashboardStats.counted_models()[sender], -1)
+
+
+for counted_model in (Student, Professor, Subject, Faculty):
+    post_init.connect(_track_active, sender=counted_model)
+    post_save.connect(_count_saved, sender=counted_model)
+    post_delete.connect(_count_deleted, sender=counted_model)
+
+
+# GPA engine: keep each student's credit-weighted running sums in step with grades.
+@receiver(post_init, sender=Grade)
+def snapshot_grade(sender, instance, **kwargs):
+    gpa.snapshot_grade(instance)
+
+
+@receiver(post_save, sender=Grade)
+def apply_saved_grade(sender, instance, created, **kwargs):
+    gpa.grade_saved(instance, created)
+
+
+@receiver(post_delete, sender=Grade)
+def apply_deleted_grade(sender, instance, **kwargs):
+    gpa.grade_deleted(instance)
+
+
+@receiver(post_init, sender=Subject)
+def snapshot_credits(sender, instance, **kwargs):
+    instance._gpa_credits = instance.__dict__.get('credits')
+
+
+@receiver(post_save, sender=Subject)
+def reweight_subject_grades(sender, instance, created, **kwargs):
+    if not created and instance._gpa_credits != instance.credits:
+        gpa.recompute_subject(instance.pk)
+    instance._gpa_credits = instance.credits
+
+
+# Response cache and conditional GET: bump a model's version once a change to
+# it commits, so no request can cache the old rows under the new version.
+@receiver([post_save, post_delete], sender=Faculty)
+@receiver([post_save, post_delete], sender=Subject)
+@receiver([post_save, post_delete], sender=Administrator)
+@receiver([post_save, post_delete], sender=Professor)
+@receiver([post_save, post_delete], sender=Student)
+# DashboardStats.objects.rebuild() saves; adjust() follows changes to the counted models
+@receiver([post_save, post_delete], sender=DashboardStats)
+def bump_response_version(sender, instance, **kwargs):
+    transaction.on_commit(lambda: bump_model_version(sender._meta.label))
+
+
+@receiver(m2m_changed, sender=Student.subjects.through)
+@receiver(m2m_changed, sender=Professor.subjects.through)
+def bump_relation_version(sender, action, **kwargs):
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        transaction.on_commit(lambda: bump_model_version(sender._meta.label))
@@ -1,3 +1,895 @@
-from django.test import TestCase
+import importlib
+import io
+import json
+import secrets
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from unittest import mock, skipUnless
 
-# Create your tests here.
+import jwt
+from asgiref.sync import async_to_sync, iscoroutinefunction
+from django.apps import apps as django_apps
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric.ed25519 import Ed25519PrivateKey
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from django.utils.http import parse_http_date
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from . import caching, renderers, tokens
+from .enrollment import bulk_enroll
+from .management.commands.check_query_plans import FULL_SCAN, hot_queries
+from .middleware import ReplicaRoutingMiddleware
+from .models import (
+    Administrator, DashboardStats, Faculty, Grade, Professor, RefreshToken, RevokedToken, Student, Subject,
+    hash_token,
+)
+from .read_serializers import ProfessorValuesSerializer, StudentValuesSerializer
+from .revocation import RevocationList
+from .routers import _read_from_replica
+from .serializers import ProfessorSerializer, StudentSerializer
+
+
+class ReplicaRoutingMiddlewareTests(SimpleTestCase):
+    def test_sync_chain(self):
+        middleware = ReplicaRoutingMiddleware(lambda request: HttpResponse())
+        self.assertFalse(iscoroutinefunction(middleware))
+        with override_settings(READ_REPLICA_ALIAS='default'):
+            response = middleware(RequestFactory().post('/api/enroll/1/'))
+        self.assertIn(settings.READ_REPLICA_PIN_COOKIE, response.cookies)
+
+    def test_async_chain(self):
+        async def get_response(request):
+            # Set as process_view would for a replica-routed view
+            _read_from_replica.set(True)
+            return HttpResponse()
+
+        middleware = ReplicaRoutingMiddleware(get_response)
+        self.assertTrue(iscoroutinefunction(middleware))
+        with override_settings(READ_REPLICA_ALIAS='default'):
+            response = async_to_sync(middleware)(RequestFactory().post('/api/enroll/1/'))
+            get = async_to_sync(middleware)(RequestFactory().get('/api/subjects/'))
+        self.assertIn(settings.READ_REPLICA_PIN_COOKIE, response.cookies)
+        self.assertNotIn(settings.READ_REPLICA_PIN_COOKIE, get.cookies)
+        self.assertFalse(_read_from_replica.get())
+
+
+class AsyncLoginTests(TestCase):
+    async def test_rejects_non_object_json(self):
+        response = await self.async_client.post('/api/login-async/', [1], content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+        response = await self.async_client.post('/api/login-async/', b'{', content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+
+    @override_settings(PASSWORD_HASH_ITERATIONS=1000)
+    def test_form_body(self):
+        User.objects.create_user('formuser', password='pw12345!')
+        response = async_to_sync(self.async_client.post)(
+            '/api/login-async/', {'username': 'formuser', 'password': 'pw12345!'}
+        )
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertIn('access_token', response.json())
+        self.assertIn('refreshToken', response.cookies)
+
+
+# Tests must never touch the shared on-disk response cache of a running server
+TEST_CACHES = {
+    **settings.CACHES,
+    settings.RESPONSE_CACHE_ALIAS: {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'test-responses',
+    },
+}
+
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'], CACHES=TEST_CACHES)
+class UniversityTestCase(TestCase):
+    """A faculty, three subjects, an administrator, a professor and enrolled students"""
+    student_count = 4
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.faculty = Faculty.objects.create(name='Computing', department='CS')
+        cls.subjects = [
+            Subject.objects.create(name=f'Subject {i}', code=f'SUB{i}', faculty=cls.faculty) for i in range(3)
+        ]
+        cls.admin_user = User.objects.create_user('admin', password='pw12345!')
+        Administrator.objects.create(user=cls.admin_user)
+        cls.professor_user = User.objects.create_user('prof', password='pw12345!')
+        cls.professor = Professor.objects.create(user=cls.professor_user, faculty=cls.faculty)
+        cls.professor.subjects.add(*cls.subjects[:2])
+        cls.students = [cls.create_student(i) for i in range(cls.student_count)]
+
+    @classmethod
+    def create_student(cls, index, subjects=None):
+        user = User.objects.create_user(f'student{index}', password='pw12345!', first_name='S', last_name=str(index))
+        student = Student.objects.create(user=user, enrollment_number=f'E{index:05d}', faculty=cls.faculty)
+        student.subjects.add(*(cls.subjects[:1] if subjects is None else subjects))
+        return student
+
+    def setUp(self):
+        # Per-process caches outlive the test transaction
+        if caching._user_cache is not None:
+            caching._user_cache.clear()
+        caches[settings.RESPONSE_CACHE_ALIAS].clear()
+        caching.reset_response_cache_stats()
+
+    def login(self, username):
+        """API client authenticated as `username`"""
+        client = APIClient()
+        response = client.post('/api/login/', {'username': username, 'password': 'pw12345!'}, format='json')
+        self.assertEqual(response.status_code, 200, response.content)
+        client.credentials(HTTP_AUTHORIZATION='Bearer ' + response.data['access_token'])
+        return client
+
+
+class GPATests(UniversityTestCase):
+    def test_gpa_is_read_only(self):
+        student = self.students[0]
+        client = self.login('admin')
+        response = client.patch(f'/api/students/{student.id}/', {'gpa': '3.90'}, format='json')
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertEqual(response.data['gpa'], '0.00')
+        student.refresh_from_db()
+        self.assertEqual(str(student.gpa), '0.00')
+
+    def test_grade_updates_gpa(self):
+        student = self.students[0]
+        client = self.login('prof')
+        with self.captureOnCommitCallbacks(execute=True):
+            response = client.post(f'/api/grade/{student.id}/{self.subjects[0].id}/', {'grade': 95}, format='json')
+        self.assertIn(response.status_code, (200, 201), response.content)
+        student.refresh_from_db()
+        self.assertEqual(str(student.gpa), '4.00')
+
+
+    def test_migration_backfills_running_totals(self):
+        student = self.students[0]
+        Grade.objects.create(student=student, subject=self.subjects[0], professor=self.professor, grade=85)
+        # As after AddField on a database that already had grades
+        Student.objects.filter(pk=student.pk).update(gpa_credits=0, gpa_points=0, gpa=Decimal('3.85'))
+        migration = importlib.import_module('university.migrations.0008_student_gpa_totals')
+        migration.backfill_gpa_totals(django_apps, None)
+        student.refresh_from_db()
+        self.assertEqual(
+            (student.gpa_credits, student.gpa_points, student.gpa), (3, Decimal('9.00'), Decimal('3.00'))
+        )
+        # Deleting the pre-existing grade now subtracts from real totals
+        Grade.objects.get(student=student).delete()
+        student.refresh_from_db()
+        self.assertEqual((student.gpa_credits, student.gpa), (0, Decimal('0.00')))
+
+
+class ExportTests(UniversityTestCase):
+    def test_professor_exports_only_own_grades(self):
+        other_user = User.objects.create_user('prof2', password='pw12345!')
+        other = Professor.objects.create(user=other_user, faculty=self.faculty)
+        other.subjects.add(self.subjects[0])
+        student = self.students[0]
+        Grade.objects.create(student=student, subject=self.subjects[0], professor=self.professor, grade=90)
+        Grade.objects.create(student=student, subject=self.subjects[0], professor=other, grade=70, notes='private')
+
+        response = self.login('prof').get('/api/grades/export/', {'file_format': 'jsonl'})
+        self.assertEqual(response.status_code, 200)
+        rows = [json.loads(line) for line in b''.join(response.streaming_content).splitlines()]
+        self.assertEqual([row['professor_username'] for row in rows], ['prof'])
+
+        response = self.login('admin').get('/api/grades/export/', {'file_format': 'jsonl'})
+        self.assertEqual(len(b''.join(response.streaming_content).splitlines()), 2)
+
+
+class ResponseCacheTests(UniversityTestCase):
+    def test_hit_after_miss(self):
+        client = self.login('admin')
+        self.assertEqual(client.get('/api/faculties/')['X-Cache'], 'MISS')
+        self.assertEqual(client.get('/api/faculties/')['X-Cache'], 'HIT')
+
+    def test_replica_reads_are_not_stored(self):
+        client = self.login('admin')
+        with override_settings(READ_REPLICA_ALIAS='default'):
+            self.assertEqual(client.get('/api/faculties/')['X-Cache'], 'MISS')
+            self.assertEqual(client.get('/api/faculties/')['X-Cache'], 'MISS')
+
+    def test_warm_command_rejects_per_process_cache(self):
+        with self.assertRaisesMessage(CommandError, 'per process'):
+            call_command('warm_response_cache', '--stats')
+
+    def test_warm_command_and_stats_on_shared_cache(self):
+        with tempfile.TemporaryDirectory() as directory:
+            shared = {**settings.CACHES, settings.RESPONSE_CACHE_ALIAS: {
+                'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': directory,
+            }}
+            with override_settings(CACHES=shared):
+                call_command('warm_response_cache', '--reset-stats', stdout=io.StringIO())
+                call_command('warm_response_cache', '--host', 'testserver', '--insecure', stdout=io.StringIO())
+                self.assertEqual(caching.response_cache_stats()['misses'], 2)
+                client = self.login('admin')
+                self.assertEqual(client.get('/api/faculties/')['X-Cache'], 'HIT')
+
+    @override_settings(RESPONSE_CACHE_STATS_FLUSH_EVERY=3)
+    def test_stats_are_counted_in_process_and_flushed_in_batches(self):
+        cache = caches[settings.RESPONSE_CACHE_ALIAS]
+        client = self.login('admin')
+        client.get('/api/faculties/')
+        client.get('/api/faculties/')
+        self.assertIsNone(cache.get('stats:hits'))
+        client.get('/api/faculties/')
+        self.assertEqual((cache.get('stats:hits'), cache.get('stats:misses')), (2, 1))
+        client.get('/api/subjects/')
+        self.assertEqual(caching.response_cache_stats(), {'hits': 2, 'misses': 2, 'hit_ratio': 0.5})
+
+
+class ConditionalGetTests(UniversityTestCase):
+    def test_unchanged_is_not_modified(self):
+        client = self.login('admin')
+        response = client.get('/api/students/')
+        self.assertEqual(client.get('/api/students/', HTTP_IF_NONE_MATCH=response['ETag']).status_code, 304)
+        self.assertEqual(
+            client.get('/api/students/', HTTP_IF_MODIFIED_SINCE=response['Last-Modified']).status_code, 304
+        )
+
+    def test_change_moves_last_modified(self):
+        client = self.login('admin')
+        last_modified = client.get('/api/students/')['Last-Modified']
+        with self.captureOnCommitCallbacks(execute=True):
+            self.students[0].save()
+        response = client.get('/api/students/', HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, 200)
+        self.assertGreater(parse_http_date(response['Last-Modified']), parse_http_date(last_modified))
+
+    def test_replica_reads_get_no_validators(self):
+        client = self.login('admin')
+        with override_settings(READ_REPLICA_ALIAS='default'):
+            response = client.get('/api/students/')
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('ETag', response)
+        self.assertNotIn('Last-Modified', response)
+
+    def test_not_modified_reads_no_source_tables(self):
+        client = self.login('admin')
+        etag = client.get('/api/admin-dashboard/')['ETag']
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get('/api/admin-dashboard/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertFalse([query['sql'] for query in queries if 'university_student' in query['sql']])
+
+    def test_grade_changes_student_etag(self):
+        student = self.students[0]
+        admin = self.login('admin')
+        professor = self.login('prof')
+        url = f'/api/students/{student.id}/'
+        etag = admin.get(url)['ETag']
+        with self.captureOnCommitCallbacks(execute=True):
+            professor.post(f'/api/grade/{student.id}/{self.subjects[0].id}/', {'grade': 95}, format='json')
+        response = admin.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['gpa'], '4.00')
+
+    def test_delete_changes_list_etag(self):
+        client = self.login('admin')
+        etag = client.get('/api/students/')['ETag']
+        with self.captureOnCommitCallbacks(execute=True):
+            self.students[-1].delete()
+        self.assertEqual(client.get('/api/students/', HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_bulk_enroll_changes_etag(self):
+        client = self.login('admin')
+        student = self.students[0]
+        etag = client.get('/api/students/')['ETag']
+        with self.captureOnCommitCallbacks(execute=True):
+            bulk_enroll([{'student_id': student.id, 'subject_id': self.subjects[2].id}])
+        self.assertEqual(client.get('/api/students/', HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+
+@override_settings(RESPONSE_CACHE_ENABLED=False)
+class ListQueryCountTests(UniversityTestCase):
+    """A list endpoint's query count must not grow with its row count"""
+    list_urls = (
+        '/api/faculties/', '/api/subjects/', '/api/administrators/',
+        '/api/professors/', '/api/students/', '/api/users/',
+    )
+
+    def grow(self, count):
+        """Add `count` more rows to every listed table, with enrollments and taught subjects"""
+        offset = Student.objects.count()
+        subjects = []
+        for i in range(count):
+            faculty = Faculty.objects.create(name=f'Faculty {offset + i}', department='CS')
+            subject = Subject.objects.create(name='Extra', code=f'EXT{offset + i}', faculty=faculty)
+            self.create_student(offset + i, subjects=[subject, *self.subjects])
+            user = User.objects.create_user(f'extra{offset + i}')
+            Administrator.objects.create(user=user)
+            professor = Professor.objects.create(user=User.objects.create_user(f'xprof{offset + i}'), faculty=faculty)
+            professor.subjects.add(subject, self.subjects[2])
+            subjects.append(subject)
+        return subjects
+
+    def query_counts(self, client, urls):
+        counts = {}
+        for url in urls:
+            with CaptureQueriesContext(connection) as queries:
+                response = client.get(url)
+            self.assertEqual(response.status_code, 200, url)
+            counts[url] = len(queries)
+        return counts
+
+    def assertQueryCountsUnchanged(self, username, urls, grow):
+        """Request `urls` as `username` before and after `grow()` and compare the query counts"""
+        client = self.login(username)
+        # Warm the per-process user cache so only the listing queries are counted
+        client.get(urls[0])
+        expected = self.query_counts(client, urls)
+        grow()
+        for url in urls:
+            with self.subTest(url=url), self.assertNumQueries(expected[url]):
+                client.get(url)
+
+    def test_query_count_is_independent_of_row_count(self):
+        self.assertQueryCountsUnchanged('admin', self.list_urls, lambda: self.grow(6))
+
+    def test_course_catalogs(self):
+        def grow():
+            subjects = self.grow(6)
+            self.students[0].subjects.add(*subjects[:3])
+            self.professor.subjects.add(*subjects[:3])
+
+        self.assertQueryCountsUnchanged('student0', ['/api/courses/'], grow)
+        self.assertQueryCountsUnchanged('prof', ['/api/professor-courses/'], grow)
+
+    def test_student_grades(self):
+        student = self.students[0]
+        Grade.objects.create(student=student, subject=self.subjects[0], professor=self.professor, grade=80)
+
+        def grow():
+            subjects = self.grow(6)
+            self.professor.subjects.add(*subjects)
+            student.subjects.add(*subjects)
+            for subject in subjects:
+                Grade.objects.create(student=student, subject=subject, professor=self.professor, grade=75)
+
+        urls = [f'/api/grades/{student.id}/', f'/api/grades/{student.id}/{self.subjects[0].id}/']
+        self.assertQueryCountsUnchanged('prof', urls, grow)
+
+    def test_professor_dashboard_summary(self):
+        def grow():
+            self.professor.subjects.add(*self.grow(6))
+
+        urls = ['/api/professor-dashboard/?mode=summary', '/api/professor-dashboard/?mode=summary&expand=students']
+        self.assertQueryCountsUnchanged('prof', urls, grow)
+
+    def test_filtered_users(self):
+        urls = [
+            '/api/users/?role=student', '/api/users/?role=professor&is_active=true',
+            '/api/users/?role=admin', '/api/users/?is_active=true',
+        ]
+        self.assertQueryCountsUnchanged('admin', urls, lambda: self.grow(6))
+
+
+class ValuesSerializerContractTests(UniversityTestCase):
+    """The values()-based list serializers must render exactly like the ModelSerializers"""
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        # Edge cases: no faculty, no subjects, optional fields set
+        loner = cls.create_student(90, subjects=[])
+        Student.objects.filter(pk=loner.pk).update(
+            faculty=None, date_of_birth=date(2001, 2, 3), phone='555-0100', gpa=Decimal('3.25')
+        )
+        Professor.objects.create(user=User.objects.create_user('prof-nofaculty'), specialization='Logic')
+
+    def assertSameRendering(self, model, serializer_class, values_serializer_class):
+        queryset = model.objects.with_related().order_by('created_at', 'id')
+        expected = serializer_class(queryset, many=True).data
+        actual = values_serializer_class(values_serializer_class.rows(queryset)).data
+        renderer = JSONRenderer()
+        self.assertEqual(renderer.render(actual), renderer.render(expected))
+
+    def test_students(self):
+        self.assertSameRendering(Student, StudentSerializer, StudentValuesSerializer)
+
+    def test_professors(self):
+        self.assertSameRendering(Professor, ProfessorSerializer, ProfessorValuesSerializer)
+
+    def test_list_endpoint_matches_detail(self):
+        client = self.login('admin')
+        for url in ('/api/students/', '/api/professors/'):
+            with self.subTest(url=url):
+                for item in client.get(url).data['results']:
+                    self.assertEqual(item, client.get(f"{url}{item['id']}/").data)
+
+
+@skipUnless(connection.vendor == 'sqlite', 'The plan check reads SQLite EXPLAIN QUERY PLAN output')
+class QueryPlanTests(TestCase):
+    def test_hot_queries_use_indexes(self):
+        for label, queryset in hot_queries():
+            with self.subTest(query=label):
+                plan = queryset.explain()
+                self.assertFalse([line for line in plan.splitlines() if FULL_SCAN.search(line)], plan)
+
+    def test_full_scan_is_detected(self):
+        plan = Student.objects.filter(phone='555-0100').explain()
+        self.assertTrue(any(FULL_SCAN.search(line) for line in plan.splitlines()), plan)
+
+
+class RefreshTokenTests(UniversityTestCase):
+    def test_stored_as_digest(self):
+        client = self.login('prof')
+        token = client.cookies['refreshToken'].value
+        stored = RefreshToken.objects.get(user=self.professor_user)
+        self.assertEqual(stored.token_hash, hash_token(token))
+        self.assertNotIn(token, stored.token_hash)
+        self.assertEqual(RefreshToken.objects.get_by_token(token), stored)
+
+    @override_settings(JWT_REFRESH_TOKENS_PER_USER=3)
+    def test_live_tokens_are_capped_per_user(self):
+        first = RefreshToken.objects.issue(self.professor_user)
+        for _ in range(4):
+            RefreshToken.objects.issue(self.professor_user)
+        self.assertEqual(RefreshToken.objects.filter(user=self.professor_user).count(), 3)
+        with self.assertRaises(RefreshToken.DoesNotExist):
+            RefreshToken.objects.get_by_token(first)
+
+    def test_renew_rotates_refresh_token(self):
+        client = self.login('prof')
+        old = client.cookies['refreshToken'].value
+        response = client.post('/api/renew/')
+        self.assertEqual(response.status_code, 200, response.content)
+        new = response.cookies['refreshToken'].value
+        self.assertNotEqual(new, old)
+        grace = timezone.now() + timedelta(seconds=settings.JWT_REFRESH_ROTATION_GRACE_SECONDS)
+        self.assertLessEqual(RefreshToken.objects.get_by_token(old).expires_at, grace)
+        self.assertEqual(RefreshToken.objects.get_by_token(new).user, self.professor_user)
+
+    def test_purge_expired_in_batches(self):
+        # issue() evicts the user's expired tokens, so create those afterwards
+        live = RefreshToken.objects.issue(self.admin_user)
+        expired = timezone.now() - timedelta(minutes=1)
+        for _ in range(5):
+            RefreshToken.objects.create(token_hash=hash_token(secrets.token_urlsafe()), user=self.admin_user,
+                                        expires_at=expired)
+        self.assertEqual(RefreshToken.objects.purge_expired(batch_size=2), 5)
+        self.assertEqual(list(RefreshToken.objects.values_list('token_hash', flat=True)), [hash_token(live)])
+
+
+def ed25519_key_entry():
+    """A JWT_SIGNING_KEYS entry with a fresh Ed25519 key pair in PEM form"""
+    private_key = Ed25519PrivateKey.generate()
+    return {
+        'algorithm': 'EdDSA',
+        'private_key': private_key.private_bytes(
+            serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()
+        ).decode(),
+        'public_key': private_key.public_key().public_bytes(
+            serialization.Encoding.PEM, serialization.PublicFormat.SubjectPublicKeyInfo
+        ).decode(),
+    }
+
+
+class AccessTokenTests(SimpleTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.signing_keys = {'2026-a': ed25519_key_entry(), '2026-b': ed25519_key_entry()}
+
+    def setUp(self):
+        self.clear_verified_tokens()
+
+    @staticmethod
+    def clear_verified_tokens():
+        cache = tokens.get_verified_token_cache()
+        if cache is not None:
+            cache.clear()
+
+    def payload(self, lifetime=60):
+        return {'user_id': 1, 'jti': secrets.token_hex(16), 'exp': int(time.time()) + lifetime}
+
+    def test_repeat_verification_is_cached(self):
+        token = tokens.encode_access_token(self.payload())
+        with mock.patch('university.tokens.jwt.decode', wraps=jwt.decode) as decode:
+            first = tokens.decode_access_token(token)
+            second = tokens.decode_access_token(token)
+        self.assertEqual(decode.call_count, 1)
+        self.assertEqual(first, second)
+
+    def test_expired_tokens_are_not_cached(self):
+        token = tokens.encode_access_token(self.payload(lifetime=-10))
+        for _ in range(2):
+            with self.assertRaises(jwt.ExpiredSignatureError):
+                tokens.decode_access_token(token)
+
+    def test_key_rotation(self):
+        with override_settings(JWT_SIGNING_KEYS=self.signing_keys, JWT_ACTIVE_KID='2026-a'):
+            old = tokens.encode_access_token(self.payload())
+        with override_settings(JWT_SIGNING_KEYS=self.signing_keys, JWT_ACTIVE_KID='2026-b'):
+            new = tokens.encode_access_token(self.payload())
+            self.assertEqual(jwt.get_unverified_header(new)['kid'], '2026-b')
+            # Tokens signed with the previous key still verify
+            self.assertEqual(tokens.decode_access_token(old)['user_id'], 1)
+            self.assertEqual(tokens.decode_access_token(new)['user_id'], 1)
+            jwks = self.client.get('/api/jwks/').json()
+        self.assertEqual(sorted(key['kid'] for key in jwks['keys']), ['2026-a', '2026-b'])
+        # Retiring a key is a settings change, so workers restart with an empty verified-token cache
+        self.clear_verified_tokens()
+        with override_settings(JWT_SIGNING_KEYS={'2026-b': self.signing_keys['2026-b']}, JWT_ACTIVE_KID='2026-b'):
+            with self.assertRaisesMessage(jwt.InvalidTokenError, 'Unknown signing key'):
+                tokens.decode_access_token(old)
+
+
+class RevocationTests(UniversityTestCase):
+    def test_logout_revokes_access_token(self):
+        client = self.login('prof')
+        self.assertEqual(client.get('/api/professor-dashboard/').status_code, 200)
+        self.assertEqual(client.post('/api/logout/').status_code, 200)
+        response = client.get('/api/professor-dashboard/')
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(str(response.data['detail']), 'Token has been revoked')
+        self.assertEqual(RevokedToken.objects.count(), 1)
+
+    def test_membership_check_reads_no_table_between_refreshes(self):
+        revocations = RevocationList(refresh_interval=60)
+        self.assertFalse(revocations.is_revoked('unknown'))
+        RevokedToken.objects.create(jti='other-worker', expires_at=timezone.now() + timedelta(minutes=5))
+        with self.assertNumQueries(0):
+            self.assertFalse(revocations.is_revoked('other-worker'))
+        revocations._next_refresh = 0.0
+        with self.assertNumQueries(1):
+            self.assertTrue(revocations.is_revoked('other-worker'))
+
+    def test_expired_revocations_are_dropped(self):
+        revocations = RevocationList(refresh_interval=60)
+        revocations.add('live', time.time() + 60)
+        revocations.add('expired', time.time() - 1)
+        RevokedToken.objects.create(jti='stale', expires_at=timezone.now() - timedelta(seconds=1))
+        revocations._next_refresh = 0.0
+        revocations.refresh()
+        self.assertEqual(set(revocations._entries), {'live'})
+        self.assertFalse(revocations.is_revoked('stale'))
+
+
+class PermissionTests(UniversityTestCase):
+    def test_user_with_several_profiles_passes_each_role_check(self):
+        Administrator.objects.create(user=self.professor_user)
+        client = self.login('prof')
+        self.assertEqual(client.get('/api/admin-dashboard/').status_code, 200)
+        response = client.get('/api/professor-dashboard/')
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertEqual(response.data['professor']['id'], self.professor.id)
+        self.assertEqual(client.get('/api/student-dashboard/').status_code, 403)
+
+    def test_role_checks_run_no_queries(self):
+        client = self.login('prof')
+        # The first request caches the user with its profiles joined
+        client.get('/api/professor-courses/')
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(client.get('/api/student-dashboard/').status_code, 403)
+        self.assertEqual(len(queries), 0, [query['sql'] for query in queries])
+
+
+class GradeImportTests(UniversityTestCase):
+    def upload(self, client, content, name='grades.csv'):
+        return client.post('/api/grades/import/', {'file': SimpleUploadedFile(name, content)})
+
+    def test_row_errors_are_reported_by_line(self):
+        # Students 0-3 are enrolled in subject 0; the professor teaches subjects 0 and 1
+        s0, s1, s2, s3 = (student.id for student in self.students)
+        taught, other_taught, not_taught = (subject.id for subject in self.subjects)
+        content = '\n'.join([
+            'student_id,subject_id,grade,notes',
+            f'{s0},{taught},91,ok',
+            f'{s1},{taught},101,',
+            f'{s2},{not_taught},80,',
+            f'999999,{taught},80,',
+            f'{s3},{other_taught},80,',
+            f'x,{taught},80,',
+        ]).encode()
+        response = self.upload(self.login('prof'), content)
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertEqual(response.data['imported'], 1)
+        self.assertEqual(response.data['errors'], [
+            {'line': 3, 'error': 'grade must be between 0 and 100'},
+            {'line': 4, 'error': 'You do not teach this subject'},
+            {'line': 5, 'error': 'Student not found'},
+            {'line': 6, 'error': 'Student is not enrolled in this subject'},
+            {'line': 7, 'error': 'student_id and subject_id must be integers'},
+        ])
+        self.assertEqual(Grade.objects.get().grade, Decimal('91.00'))
+
+    def test_jsonl_malformed_lines(self):
+        student, subject = self.students[0].id, self.subjects[0].id
+        content = f'{{"student_id": {student}, "subject_id": {subject}, "grade": 75}}\n[1]\n{{broken\n'.encode()
+        response = self.upload(self.login('prof'), content, name='grades.jsonl')
+        self.assertEqual(response.data['imported'], 1)
+        self.assertEqual([error['line'] for error in response.data['errors']], [2, 3])
+
+    def test_upsert_updates_and_reactivates(self):
+        student = self.students[0]
+        grade = Grade.objects.create(
+            student=student, subject=self.subjects[0], professor=self.professor, grade=50, is_active=False
+        )
+        content = f'student_id,subject_id,grade,notes\n{student.id},{self.subjects[0].id},95,resit\n'.encode()
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.upload(self.login('prof'), content)
+        self.assertEqual(response.data, {'imported': 1, 'errors': []})
+        grade.refresh_from_db()
+        self.assertEqual((grade.grade, grade.notes, grade.is_active), (Decimal('95.00'), 'resit', True))
+        self.assertEqual(Grade.objects.count(), 1)
+        student.refresh_from_db()
+        self.assertEqual(student.gpa, Decimal('4.00'))
+
+    def test_decode_error_keeps_imported_rows_and_reports_line(self):
+        s0, s1 = self.students[0].id, self.students[1].id
+        subject = self.subjects[0].id
+        content = (
+            f'student_id,subject_id,grade,notes\n{s0},{subject},80,\n{s1},{subject},70,\n'.encode()
+            + b'\xff\xfe,bad,bytes,\n'
+        )
+        response = self.upload(self.login('prof'), content)
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertEqual(response.data['imported'], 2)
+        self.assertEqual(len(response.data['errors']), 1)
+        self.assertEqual(response.data['errors'][0]['line'], 4)
+        self.assertIn('Could not read the file', response.data['errors'][0]['error'])
+        self.assertEqual(Grade.objects.count(), 2)
+
+    def test_only_professors_may_import(self):
+        content = f'student_id,subject_id,grade\n{self.students[0].id},{self.subjects[0].id},80\n'.encode()
+        self.assertEqual(self.upload(self.login('admin'), content).status_code, 403)
+        self.assertEqual(self.upload(self.login('student0'), content).status_code, 403)
+        self.assertFalse(Grade.objects.exists())
+
+    def test_unsupported_format(self):
+        response = self.login('prof').post(
+            '/api/grades/import/?file_format=xlsx', {'file': SimpleUploadedFile('grades.xlsx', b'')}
+        )
+        self.assertEqual(response.status_code, 400)
+
+
+class UserCacheTests(UniversityTestCase):
+    def test_hits_skip_the_query_and_are_counted(self):
+        cache = caching.get_user_cache()
+        user_id = self.professor_user.id
+        with self.assertNumQueries(1):
+            first = caching.get_active_user(user_id)
+        with self.assertNumQueries(0):
+            second = caching.get_active_user(user_id)
+        self.assertIsNot(first, second)
+        self.assertEqual(second.role, 'professor')
+        stats = cache.stats()
+        self.assertEqual((stats['hits'], stats['misses'], stats['size']), (1, 1, 1))
+
+    def test_account_change_invalidates_now_and_after_commit(self):
+        cache = caching.get_user_cache()
+        user = self.professor_user
+        stale = caching.get_active_user(user.id)
+        with self.captureOnCommitCallbacks(execute=True):
+            user.is_active = False
+            user.save()
+            self.assertIsNone(cache.get(user.id))
+            # A concurrent request re-caching the still-committed old row
+            cache.set(user.id, stale)
+        with self.assertRaises(User.DoesNotExist):
+            caching.get_active_user(user.id)
+
+    def test_profile_change_invalidates(self):
+        user = self.admin_user
+        self.assertEqual(caching.get_active_user(user.id).role, 'admin')
+        with self.captureOnCommitCallbacks(execute=True):
+            Administrator.objects.filter(user=user).get().delete()
+        self.assertEqual(caching.get_active_user(user.id).role, 'user')
+
+    @override_settings(JWT_USER_CACHE_ENABLED=False)
+    def test_disabled_cache_loads_every_time(self):
+        self.assertIsNone(caching.get_user_cache())
+        for _ in range(2):
+            with self.assertNumQueries(1):
+                caching.get_active_user(self.professor_user.id)
+
+
+class DashboardStatsTests(UniversityTestCase):
+    def assertCountsAreExact(self):
+        live = {
+            field: model.objects.filter(is_active=True).count()
+            for model, field in DashboardStats.counted_models().items()
+        }
+        stats = DashboardStats.objects.current()
+        self.assertEqual({field: getattr(stats, field) for field in live}, live)
+
+    def total_students(self):
+        return DashboardStats.objects.current().total_students
+
+    def test_fixture_counts(self):
+        self.assertCountsAreExact()
+        response = self.login('admin').get('/api/admin-dashboard/')
+        totals = ('total_students', 'total_professors', 'total_subjects', 'total_faculties')
+        self.assertEqual([response.data[key] for key in totals], [4, 1, 3, 1])
+
+    def test_create_and_active_flips(self):
+        student = self.create_student(10)
+        self.assertEqual(self.total_students(), 5)
+        student.is_active = False
+        student.save()
+        self.assertEqual(self.total_students(), 4)
+        student.save()
+        self.assertEqual(self.total_students(), 4)
+        student.is_active = True
+        student.save()
+        self.assertEqual(self.total_students(), 5)
+        Subject.objects.create(name='Inactive', code='OFF1', faculty=self.faculty, is_active=False)
+        self.assertCountsAreExact()
+
+    def test_delete(self):
+        self.students[0].delete()
+        self.assertEqual(self.total_students(), 3)
+        inactive = self.students[1]
+        inactive.is_active = False
+        inactive.save()
+        inactive.delete()
+        self.assertEqual(self.total_students(), 2)
+        self.assertCountsAreExact()
+
+    def test_missing_row_is_rebuilt(self):
+        DashboardStats.objects.all().delete()
+        Subject.objects.create(name='New', code='NEW1', faculty=self.faculty)
+        self.assertEqual(DashboardStats.objects.current().total_subjects, 4)
+        self.assertCountsAreExact()
+
+    def test_rebuild_command_matches_live_counts(self):
+        # Queryset updates skip the signals, so the counters drift until a rebuild
+        Student.objects.filter(pk__in=[self.students[0].pk, self.students[1].pk]).update(is_active=False)
+        self.assertEqual(self.total_students(), 4)
+        call_command('rebuild_dashboard_stats', stdout=io.StringIO())
+        self.assertEqual(self.total_students(), 2)
+        self.assertCountsAreExact()
+
+
+class BulkEnrollTests(UniversityTestCase):
+    def enroll(self, client, enrollments):
+        return client.post('/api/enroll-bulk/', {'enrollments': enrollments}, format='json')
+
+    def test_each_result_status(self):
+        student, other = self.students[0].id, self.students[1].id
+        enrolled_in, new, untaught = (subject.id for subject in self.subjects)
+        retired = Subject.objects.create(name='Retired', code='OLD1', faculty=self.faculty, is_active=False)
+        items = [
+            {'student_id': student, 'subject_id': new},
+            {'student_id': student, 'subject_id': new},
+            {'student_id': student, 'subject_id': enrolled_in},
+            {'student_id': 999999, 'subject_id': new},
+            {'student_id': other, 'subject_id': retired.id},
+            {'student_id': other, 'subject_id': untaught},
+            {'student_id': 'x', 'subject_id': new},
+            {'subject_id': new},
+        ]
+        response = self.enroll(self.login('prof'), items)
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertEqual(response.data['enrolled'], 1)
+        self.assertEqual([result['status'] for result in response.data['results']], [
+            'enrolled', 'already_enrolled', 'already_enrolled', 'student_not_found',
+            'subject_not_found', 'not_teaching', 'invalid', 'invalid',
+        ])
+        self.assertEqual(response.data['results'][6], {'item': items[6], 'status': 'invalid'})
+        self.assertEqual(set(self.students[0].subjects.values_list('id', flat=True)), {enrolled_in, new})
+
+    def test_admin_may_enroll_into_any_active_subject(self):
+        untaught = self.subjects[2].id
+        response = self.enroll(self.login('admin'), [{'student_id': self.students[0].id, 'subject_id': untaught}])
+        self.assertEqual(response.data['results'][0]['status'], 'enrolled')
+
+    def test_students_may_not_bulk_enroll(self):
+        item = {'student_id': self.students[0].id, 'subject_id': self.subjects[1].id}
+        response = self.enroll(self.login('student0'), [item])
+        self.assertEqual(response.status_code, 403)
+
+    @override_settings(BULK_ENROLL_MAX_PAIRS=2)
+    def test_request_size_is_limited(self):
+        items = [{'student_id': student.id, 'subject_id': self.subjects[1].id} for student in self.students[:3]]
+        response = self.enroll(self.login('admin'), items)
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data, {'error': 'At most 2 enrollments per request'})
+        self.assertEqual(self.enroll(self.login('admin'), items[:2]).data['enrolled'], 2)
+
+    def test_body_must_be_a_non_empty_list(self):
+        client = self.login('admin')
+        for body in ({'enrollments': []}, {'enrollments': {}}, {}):
+            with self.subTest(body=body):
+                self.assertEqual(client.post('/api/enroll-bulk/', body, format='json').status_code, 400)
+
+
+class GradebookTests(UniversityTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        s0, s1, _, s3 = cls.students
+        s1.subjects.add(cls.subjects[1])
+        s3.is_active = False
+        s3.save()
+        Grade.objects.create(student=s0, subject=cls.subjects[0], professor=cls.professor, grade=Decimal('88.5'))
+        # Another professor's grade for an enrollment this professor also teaches is never shown
+        other = Professor.objects.create(user=User.objects.create_user('prof2'), faculty=cls.faculty)
+        Grade.objects.create(student=s1, subject=cls.subjects[0], professor=other, grade=70)
+
+    def cells(self, data):
+        cells = data['cells']
+        return set(zip(cells['row'], cells['col'], cells['grade']))
+
+    def test_matrix(self):
+        response = self.login('prof').get('/api/gradebook/')
+        self.assertEqual(response.status_code, 200)
+        subject0, subject1 = self.subjects[:2]
+        self.assertEqual(response.data['subjects'], [
+            {'id': subject0.id, 'code': 'SUB0', 'name': 'Subject 0'},
+            {'id': subject1.id, 'code': 'SUB1', 'name': 'Subject 1'},
+        ])
+        self.assertEqual(response.data['students'], [
+            {'id': student.id, 'enrollment_number': student.enrollment_number, 'name': f'S {index}'}
+            for index, student in enumerate(self.students[:3])
+        ])
+        self.assertEqual(self.cells(response.data), {
+            (0, 0, '88.50'), (1, 0, None), (1, 1, None), (2, 0, None),
+        })
+
+    def test_subject_filter(self):
+        client = self.login('prof')
+        response = client.get('/api/gradebook/', {'subject_id': self.subjects[1].id})
+        self.assertEqual([subject['code'] for subject in response.data['subjects']], ['SUB1'])
+        self.assertEqual([student['id'] for student in response.data['students']], [self.students[1].id])
+        self.assertEqual(self.cells(response.data), {(0, 0, None)})
+        self.assertEqual(client.get('/api/gradebook/', {'subject_id': self.subjects[2].id}).status_code, 403)
+        self.assertEqual(client.get('/api/gradebook/', {'subject_id': 'x'}).status_code, 400)
+
+    def test_professors_only(self):
+        self.assertEqual(self.login('student0').get('/api/gradebook/').status_code, 403)
+        self.assertEqual(self.login('admin').get('/api/gradebook/').status_code, 403)
+
+
+class FastJSONRendererTests(SimpleTestCase):
+    payloads = [
+        {'ints': [0, -1, 2 ** 63 - 1, 2 ** 64, -(2 ** 70)]},
+        {'floats': [1.5, 0.00001, 1e20, 1e-7, -0.0]},
+        {'text': 'line\u2028paragraph\u2029end', 'unicode': 'Ünïcode ✓'},
+        {'aware': datetime(2024, 5, 1, 12, 30, tzinfo=timezone.get_fixed_timezone(0))},
+        {'offset': datetime(2024, 5, 1, 12, 30, 15, 123456, tzinfo=timezone.get_fixed_timezone(120))},
+        {'naive': datetime(2024, 5, 1, 12, 30), 'date': date(2024, 5, 1), 'delta': timedelta(hours=1)},
+        {'decimal': Decimal('88.50'), 'whole': Decimal('3'), 'nested': [{'gpa': Decimal('3.85')}]},
+        [{'id': 1, 'name': 'plain', 'active': True, 'none': None}],
+        {1: 'non-string key'},
+    ]
+
+    def assertParity(self, accepted_media_type=None):
+        for payload in self.payloads:
+            with self.subTest(payload=payload):
+                self.assertEqual(
+                    renderers.FastJSONRenderer().render(payload, accepted_media_type),
+                    JSONRenderer().render(payload, accepted_media_type),
+                )
+
+    def test_parity(self):
+        self.assertParity()
+
+    def test_parity_indented(self):
+        self.assertParity('application/json; indent=2')
+
+    def test_parity_without_orjson(self):
+        with mock.patch.object(renderers, 'orjson', None):
+            self.assertParity()
+
+    @skipUnless(renderers.orjson, 'Needs orjson')
+    def test_orjson_path(self):
+        payload = self.payloads[-2]
+        with mock.patch.object(JSONRenderer, 'render') as fallback:
+            self.assertEqual(
+                renderers.FastJSONRenderer().render(payload),
+                b'[{"id":1,"name":"plain","active":true,"none":null}]',
+            )
+        fallback.assert_not_called()
@@ -0,0 +1,88 @@
+import hashlib
+import time
+
+import jwt
+from jwt.algorithms import get_default_algorithms
+from django.conf import settings
+
+from .caching import TTLCache
+
+
+def _active_key():
+    """Return (kid, algorithm, signing key) used for new access tokens"""
+    kid = settings.JWT_ACTIVE_KID
+    if kid:
+        entry = settings.JWT_SIGNING_KEYS[kid]
+        return kid, entry['algorithm'], entry['private_key']
+    return None, settings.JWT_ALGORITHM, settings.JWT_SECRET_KEY
+
+
+def _verification_key(token):
+    """Pick the verification key and algorithm from the token's `kid` header"""
+    kid = jwt.get_unverified_header(token).get('kid')
+    if kid is None:
+        return settings.JWT_ALGORITHM, settings.JWT_SECRET_KEY
+    entry = settings.JWT_SIGNING_KEYS.get(kid)
+    if entry is None:
+        raise jwt.InvalidTokenError('Unknown signing key')
+    return entry['algorithm'], entry['public_key']
+
+
+def encode_access_token(payload):
+    """Sign an access token with the active key"""
+    kid, algorithm, key = _active_key()
+    headers = {'kid': kid} if kid else None
+    token = jwt.encode(payload, key, algorithm=algorithm, headers=headers)
+    # PyJWT returns string in newer versions, ensure it's a string
+    if isinstance(token, bytes):
+        token = token.decode('utf-8')
+    return token
+
+
+_verified_tokens = None
+
+
+def get_verified_token_cache():
+    """Return the per-process cache of verified tokens, or None when it is disabled"""
+    global _verified_tokens
+    size = getattr(settings, 'JWT_VERIFIED_TOKEN_CACHE_SIZE', 0)
+    if not size:
+        return None
+    if _verified_tokens is None:
+        _verified_tokens = TTLCache(maxsize=size)
+    return _verified_tokens
+
+
+def decode_access_token(token):
+    """
+    Verify an access token and return its payload.
+    Tokens that already passed verification are served from a cache until
+    their `exp`, so repeat requests skip the signature check.
+    Raises jwt.InvalidTokenError (or a subclass) for bad tokens.
+    """
+    cache = get_verified_token_cache()
+    key = hashlib.sha256(token.encode('utf-8')).digest()
+    if cache is not None:
+        payload = cache.get(key)
+        if payload is not None:
+            return payload
+
+    algorithm, verification_key = _verification_key(token)
+    payload = jwt.decode(token, verification_key, algorithms=[algorithm])
+
+    if cache is not None and 'exp' in payload:
+        ttl = payload['exp'] - time.time()
+        if ttl > 0:
+            cache.set(key, payload, ttl=ttl)
+    return payload
+
+
+def public_jwks():
+    """Public keys in JWK Set format so other services can verify tokens"""
+    keys = []
+    for kid, entry in settings.JWT_SIGNING_KEYS.items():
+        algorithm = get_default_algorithms()[entry['algorithm']]
+        jwk = algorithm.to_jwk(algorithm.prepare_key(entry['public_key']), as_dict=True)
+        jwk.update({'kid': kid, 'alg': entry['algorithm'], 'use': 'sig'})
+        keys.append(jwk)
+    return {'keys': keys}
@@ -15,8 +15,10 @@ urlpatterns = [
     path('', include(router.urls)),
     path('users/', views.get_users, name='get_users'),
     path('login/', views.login_view, name='login'),
+    path('login-async/', views.login_async_view, name='login_async'),
     path('logout/', views.logout_view, name='logout'),
     path('renew/', views.renew_token_view, name='renew'),
+    path('jwks/', views.jwks_view, name='jwks'),
     path('admin-dashboard/', views.admin_dashboard, name='admin_dashboard'),
     path('professor-dashboard/', views.professor_dashboard, name='professor_dashboard'),
     path('student-dashboard/', views.student_dashboard, name='student_dashboard'),
@@ -25,7 +27,12 @@ urlpatterns = [
     path('enroll/<int:subject_id>/', views.enroll_course, name='enroll_course'),
     path('enroll-professor/<int:subject_id>/', views.enroll_professor_course, name='enroll_professor_course'),
     path('enroll-student/<int:student_id>/<int:subject_id>/', views.enroll_student, name='enroll_student'),
+    path('enroll-bulk/', views.bulk_enroll_students, name='bulk_enroll_students'),
     path('grade/<int:student_id>/<int:subject_id>/', views.grade_student, name='grade_student'),
+    path('grades/import/', views.import_grades_view, name='import_grades'),
+    path('grades/export/', views.export_grades, name='export_grades'),
+    path('gradebook/', views.gradebook, name='gradebook'),
+    path('roster/export/', views.export_roster, name='export_roster'),
     path('grades/<int:student_id>/', views.get_student_grades, name='get_student_grades'),
     path('grades/<int:student_id>/<int:subject_id>/', views.get_student_grades, name='get_student_grade'),
 ]
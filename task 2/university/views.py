@@ -3,61 +3,72 @@ from rest_framework.decorators import action, api_view, permission_classes
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from django.contrib.auth.models import User
+from django.http import JsonResponse, StreamingHttpResponse
 from django.shortcuts import render
+from asgiref.sync import sync_to_async
 from django.views.decorators.csrf import csrf_exempt
 import jwt
 import json
+import uuid
 from datetime import datetime, timedelta
+from decimal import Decimal
 from django.conf import settings
-from .models import Faculty, Subject, Administrator, Professor, Student, Grade, RefreshToken
+from django.db.models import Count, Exists, OuterRef, Prefetch, Q, Subquery, prefetch_related_objects
+from .models import Faculty, Subject, Administrator, Professor, Student, Grade, RefreshToken, DashboardStats
 from .serializers import (
-    FacultySerializer, SubjectSerializer, AdministratorSerializer,
+    FacultySerializer, SubjectSerializer, CourseSerializer, AdministratorSerializer,
     ProfessorSerializer, StudentSerializer, DashboardAdminSerializer,
-    DashboardProfessorSerializer, DashboardStudentSerializer, GradeSerializer
+    DashboardProfessorSerializer, DashboardStudentSerializer, GradeSerializer,
+    StudentSummarySerializer, TaughtSubjectSerializer
+)
+from .caching import CachedResponseMixin
+from .conditional import ConditionalGetMixin, conditional_get
+from .database import retry_on_lock
+from .enrollment import bulk_enroll
+from . import exports
+from .grade_import import detect_format, import_grades, iter_file_lines
+from .pagination import CreatedAtCursorPagination, UserCursorPagination
+from .passwords import acheck_and_upgrade
+from .read_serializers import ProfessorValuesSerializer, StudentValuesSerializer, ValuesListMixin
+from .revocation import revoke
+from .tokens import decode_access_token, encode_access_token, public_jwks
+from .permissions import (
+    ROLES, IsAdmin, IsAdminOrProfessor, IsProfessor, IsStudent, get_request_profile, get_request_role,
+    get_user_role, role_expression
 )
-from .permissions import IsAdmin, IsProfessor, IsStudent
 
 
 @api_view(['GET'])
 @permission_classes([AllowAny])
 def get_users(request):
-    """Get all users for debugging"""
-    users = User.objects.all()
-    user_list = []
-    
-    for user in users:
-        role = 'user'
-        if hasattr(user, 'administrator'):
-            role = 'admin'
-        elif hasattr(user, 'professor'):
-            role = 'professor'
-        elif hasattr(user, 'student'):
-            role = 'student'
-        
-        user_list.append({
-            'id': user.id,
-            'username': user.username,
-            'email': user.email,
-            'role': role,
-            'is_active': user.is_active,
-            'is_staff': user.is_staff
-        })
+    """
+    Get users for debugging, one cursor page at a time.
+    The role is computed in the same query; filter with `?role=` and `?is_active=`.
+    """
+    users = User.objects.annotate(role=role_expression())
+    
+    role = request.query_params.get('role')
+    if role is not None:
+        if role not in ROLES:
+            return Response({'error': f'role must be one of {", ".join(ROLES)}'}, status=status.HTTP_400_BAD_REQUEST)
+        users = users.filter(role=role)
+    
+    is_active = request.query_params.get('is_active')
+    if is_active is not None:
+        if is_active.lower() not in ('true', 'false', '1', '0'):
+            return Response({'error': 'is_active must be true or false'}, status=status.HTTP_400_BAD_REQUEST)
+        users = users.filter(is_active=is_active.lower() in ('true', '1'))
+    
+    paginator = UserCursorPagination()
+    page = paginator.paginate_queryset(
+        users.values('id', 'username', 'email', 'role', 'is_active', 'is_staff', 'date_joined'), request
+    )
+    user_list = [
+        {key: value for key, value in user.items() if key != 'date_joined'}
+        for user in page
+    ]
     
-    return Response({
-        'total_users': len(user_list),
-        'users': user_list
-    })
-
-
-def _get_user_role(user):
-    """Determine user role"""
-    if hasattr(user, 'administrator'):
-        return 'admin'
-    elif hasattr(user, 'professor'):
-        return 'professor'
-    elif hasattr(user, 'student'):
-        return 'student'
-    return 'user'
+    return paginator.get_paginated_response(user_list)
 
 
 def _create_jwt_token(user, role):
@@ -69,33 +80,58 @@ def _create_jwt_token(user, role):
         'username': user.username,
         'email': user.email,
         'role': role,
+        'jti': uuid.uuid4().hex,
         'iat': int(now.timestamp()),
         'exp': int((now + timedelta(minutes=settings.JWT_EXPIRATION_DELTA_MINUTES)).timestamp())
     }
-    token = jwt.encode(payload, settings.JWT_SECRET_KEY, algorithm=settings.JWT_ALGORITHM)
-    # PyJWT returns string in newer versions, ensure it's a string
-    if isinstance(token, bytes):
-        token = token.decode('utf-8')
-    return token
+    return encode_access_token(payload)
 
 
 def _create_refresh_token(user):
-    """Create refresh token and store in database"""
-    import secrets
-    from django.utils import timezone
-    
-    # Generate a secure random token (not JWT, just a random string)
-    token = secrets.token_urlsafe(64)
-    expires_at = timezone.now() + timedelta(days=settings.JWT_REFRESH_EXPIRATION_DELTA_DAYS)
-    
-    # Store in database
-    RefreshToken.objects.create(
-        token=token,
-        user=user,
-        expires_at=expires_at
+    """Create refresh token and store its digest in database"""
+    return RefreshToken.objects.issue(user)
+
+
+def _set_refresh_cookie(response, refresh_token):
+    """Store refresh token in HttpOnly cookie"""
+    response.set_cookie(
+        'refreshToken',
+        refresh_token,
+        httponly=True,
+        secure=True,  # Use True for HTTPS
+        samesite='None',  # Allow cross-origin cookies
+        max_age=settings.JWT_REFRESH_EXPIRATION_DELTA_DAYS * 24 * 60 * 60,  # 1 day
+        domain=None  # Don't set domain to allow cross-origin
     )
-    
-    return token
+
+
+def _login_payload(user, role, access_token):
+    """Response body returned by the login endpoints"""
+    return {
+        'message': 'Login successful',
+        'access_token': access_token,  # JWT in response body
+        'user_id': user.id,
+        'username': user.username,
+        'email': user.email,
+        'role': role,
+    }
+
+
+def _set_login_cookies(response, access_token, refresh_token):
+    """Store the access token and refresh token cookies set on login"""
+    # Store access token in cookie (not HttpOnly so JS can read it for Authorization header)
+    response.set_cookie(
+        'accessToken',
+        access_token,
+        httponly=False,  # Allow JS to read for Authorization header
+        secure=True,  # Use True for HTTPS
+        samesite='None',  # Allow cross-origin cookies
+        max_age=settings.JWT_EXPIRATION_DELTA_MINUTES * 60,  # 15 minutes
+        domain=None  # Don't set domain to allow cross-origin
+    )
+
+    # Store refresh token in HttpOnly cookie
+    _set_refresh_cookie(response, refresh_token)
 
 
 @csrf_exempt
@@ -110,44 +146,17 @@ def login_view(request):
         try:
             user = User.objects.get(username=username)
             if user.check_password(password) and user.is_active:
-                role = _get_user_role(user)
+                role = get_user_role(user)
                 
                 # Create tokens
                 access_token = _create_jwt_token(user, role)
                 refresh_token = _create_refresh_token(user)
 
                 # Return JWT in response body and store in cookie
-                response = Response({
-                    'message': 'Login successful',
-                    'access_token': access_token,  # JWT in response body
-                    'user_id': user.id,
-                    'username': user.username,
-                    'email': user.email,
-                    'role': role,
-                }, status=status.HTTP_200_OK)
-
-                # Store access token in cookie (not HttpOnly so JS can read it for Authorization header)
-                response.set_cookie(
-                    'accessToken',
-                    access_token,
-                    httponly=False,  # Allow JS to read for Authorization header
-                    secure=True,  # Use True for HTTPS
-                    samesite='None',  # Allow cross-origin cookies
-                    max_age=settings.JWT_EXPIRATION_DELTA_MINUTES * 60,  # 15 minutes
-                    domain=None  # Don't set domain to allow cross-origin
+                response = Response(
+                    _login_payload(user, role, access_token), status=status.HTTP_200_OK
                 )
-
-                # Store refresh token in HttpOnly cookie
-                response.set_cookie(
-                    'refreshToken',
-                    refresh_token,
-                    httponly=True,
-                    secure=True,  # Use True for HTTPS
-                    samesite='None',  # Allow cross-origin cookies
-                    max_age=settings.JWT_REFRESH_EXPIRATION_DELTA_DAYS * 24 * 60 * 60,  # 1 day
-                    domain=None  # Don't set domain to allow cross-origin
-                )
-
+                _set_login_cookies(response, access_token, refresh_token)
                 return response
             else:
                 return Response({'error': 'Invalid credentials'}, status=status.HTTP_401_UNAUTHORIZED)
@@ -157,17 +166,78 @@ def login_view(request):
     return Response({'message': 'Use POST with username and password'})
 
 
+@csrf_exempt
+async def login_async_view(request):
+    """
+    Async login for ASGI deployments.
+    Password hashing runs in a bounded process pool so the event loop keeps
+    serving other requests; outdated hashes are upgraded transparently.
+    """
+    if request.method != 'POST':
+        return JsonResponse({'message': 'Use POST with username and password'})
+
+    if request.content_type == 'application/json':
+        try:
+            data = json.loads(request.body or b'{}')
+        except ValueError:
+            return JsonResponse({'error': 'Invalid JSON body'}, status=status.HTTP_400_BAD_REQUEST)
+        if not isinstance(data, dict):
+            return JsonResponse({'error': 'JSON body must be an object'}, status=status.HTTP_400_BAD_REQUEST)
+    else:
+        # Form-encoded and multipart bodies, which /api/login/ accepts too
+        data = request.POST
+    username = data.get('username')
+    password = data.get('password')
+
+    try:
+        user = await User.objects.aget(username=username)
+    except User.DoesNotExist:
+        return JsonResponse({'error': 'User not found'}, status=status.HTTP_404_NOT_FOUND)
+
+    is_correct, new_encoded = await acheck_and_upgrade(password or '', user.password)
+    if not (is_correct and user.is_active):
+        return JsonResponse({'error': 'Invalid credentials'}, status=status.HTTP_401_UNAUTHORIZED)
+
+    if new_encoded:
+        user.password = new_encoded
+        await user.asave(update_fields=['password'])
+
+    role = await sync_to_async(get_user_role)(user)
+    access_token = _create_jwt_token(user, role)
+    refresh_token = await sync_to_async(_create_refresh_token)(user)
+
+    response = JsonResponse(_login_payload(user, role, access_token), status=status.HTTP_200_OK)
+    _set_login_cookies(response, access_token, refresh_token)
+    return response
+
+
+def _get_request_access_token(request):
+    """Access token from the Authorization header or the accessToken cookie"""
+    auth_header = request.META.get('HTTP_AUTHORIZATION', '')
+    if auth_header.startswith('Bearer '):
+        return auth_header[len('Bearer '):]
+    return request.COOKIES.get('accessToken')
+
+
 @csrf_exempt
 @api_view(['POST'])
 @permission_classes([AllowAny])
 def logout_view(request):
-    """Logout: remove refresh token from DB and delete cookie"""
+    """Logout: remove refresh token from DB, revoke the access token and delete cookies"""
     refresh_token = request.COOKIES.get('refreshToken')
+    access_token = _get_request_access_token(request)
+    
+    if access_token:
+        # Revoke the access token so it can't be reused until it expires
+        try:
+            revoke(decode_access_token(access_token))
+        except jwt.InvalidTokenError:
+            pass  # Expired or invalid tokens need no revocation
     
     if refresh_token:
         # Remove refresh token from database
         try:
-            RefreshToken.objects.filter(token=refresh_token).delete()
+            RefreshToken.objects.revoke(refresh_token)
         except Exception:
             pass  # Token might not exist, continue anyway
     
@@ -182,7 +252,7 @@ def logout_view(request):
 @api_view(['POST'])
 @permission_classes([AllowAny])
 def renew_token_view(request):
-    """Renew: read refresh token from cookie, validate against DB, return new JWT in response body"""
+    """Renew: read refresh token from cookie, validate against DB, rotate it and return new JWT in response body"""
     refresh_token = request.COOKIES.get('refreshToken')
     
     if not refresh_token:
@@ -190,11 +260,12 @@ def renew_token_view(request):
     
     try:
         # Validate refresh token against database
-        refresh_token_obj = RefreshToken.objects.get(token=refresh_token)
+        refresh_token_obj = RefreshToken.objects.get_by_token(refresh_token)
         
         # Check if token is expired
         from django.utils import timezone
-        if refresh_token_obj.expires_at < timezone.now():
+        now = timezone.now()
+        if refresh_token_obj.expires_at < now:
             # Delete expired token
             refresh_token_obj.delete()
             return Response({'error': 'Refresh token expired'}, status=status.HTTP_401_UNAUTHORIZED)
@@ -205,9 +276,17 @@ def renew_token_view(request):
             return Response({'error': 'User is inactive'}, status=status.HTTP_401_UNAUTHORIZED)
         
         # Get user role and create new JWT with SAME payload/claims
-        role = _get_user_role(user)
+        role = get_user_role(user)
         access_token = _create_jwt_token(user, role)
 
+        # Rotate the refresh token. The old one stays valid for a short grace
+        # window so concurrent renew calls from the same client still succeed.
+        grace_expiry = now + timedelta(seconds=settings.JWT_REFRESH_ROTATION_GRACE_SECONDS)
+        if refresh_token_obj.expires_at > grace_expiry:
+            refresh_token_obj.expires_at = grace_expiry
+            refresh_token_obj.save(update_fields=['expires_at'])
+        new_refresh_token = _create_refresh_token(user)
+
         # Return new JWT in response body and store in cookie
         response = Response({
             'message': 'Token renewed',
@@ -223,6 +302,7 @@ def renew_token_view(request):
             samesite='Lax',
             max_age=settings.JWT_EXPIRATION_DELTA_MINUTES * 60  # 15 minutes
         )
+        _set_refresh_cookie(response, new_refresh_token)
         
         return response
     
@@ -232,34 +312,90 @@ def renew_token_view(request):
         return Response({'error': f'Token renewal failed: {str(e)}'}, status=status.HTTP_401_UNAUTHORIZED)
 
 
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def jwks_view(request):
+    """Public verification keys for asymmetrically signed access tokens"""
+    return Response(public_jwks())
+
+
 @api_view(['GET'])
 @permission_classes([IsAuthenticated, IsAdmin])
+@conditional_get(
+    DashboardStats, Student, 'auth.User', Faculty, Subject, Student.subjects.through, Professor, Administrator
+)
 def admin_dashboard(request):
     """Get admin dashboard data - Admin only"""
+    stats = DashboardStats.objects.current()
     data = {
-        'total_students': Student.objects.filter(is_active=True).count(),
-        'total_professors': Professor.objects.filter(is_active=True).count(),
-        'total_subjects': Subject.objects.filter(is_active=True).count(),
-        'total_faculties': Faculty.objects.filter(is_active=True).count(),
-        'recent_enrollments': Student.objects.filter(is_active=True).order_by('-created_at')[:5]
+        'total_students': stats.total_students,
+        'total_professors': stats.total_professors,
+        'total_subjects': stats.total_subjects,
+        'total_faculties': stats.total_faculties,
+        'recent_enrollments': Student.objects.with_related().filter(is_active=True).order_by('-created_at')[:5]
     }
     
     serializer = DashboardAdminSerializer(data)
     return Response(serializer.data)
 
 
+def _professor_students(professor):
+    """
+    Active students enrolled in any of the professor's subjects (no DISTINCT needed).
+    Driven from the enrollment tables, so only those students' rows are read.
+    """
+    enrolled = Student.subjects.through.objects.filter(subject__professors=professor).values('student_id')
+    return Student.objects.filter(id__in=enrolled, is_active=True)
+
+
+def _professor_dashboard_summary(request, professor):
+    """Aggregate-driven professor dashboard with a paginated student listing"""
+    subjects = professor.subjects.select_related('faculty').annotate(
+        enrolled_count=Count('students', filter=Q(students__is_active=True))
+    )
+    students = _professor_students(professor)
+    
+    expand = 'students' in request.query_params.get('expand', '').split(',')
+    paginator = CreatedAtCursorPagination()
+    page = paginator.paginate_queryset(
+        students.with_related() if expand else students.select_related('user', 'faculty'), request
+    )
+    student_serializer = StudentSerializer if expand else StudentSummarySerializer
+    
+    return Response({
+        'professor': ProfessorSerializer(professor).data,
+        'subjects': TaughtSubjectSerializer(subjects, many=True).data,
+        'students_count': students.count(),
+        'students': {
+            'next': paginator.get_next_link(),
+            'previous': paginator.get_previous_link(),
+            'results': student_serializer(page, many=True).data,
+        },
+    })
+
+
 @api_view(['GET'])
 @permission_classes([IsAuthenticated, IsProfessor])
+@conditional_get(Professor, 'auth.User', Faculty, Subject, Professor.subjects.through, Student, Student.subjects.through)
 def professor_dashboard(request):
-    """Get professor dashboard data - Professor only"""
-    try:
-        professor = Professor.objects.get(user=request.user)
-    except Professor.DoesNotExist:
+    """
+    Get professor dashboard data - Professor only.
+    `?mode=summary` returns per-subject enrollment counts and a cursor-paginated
+    page of slim student rows (`?expand=students` for full student objects).
+    """
+    professor = get_request_profile(request, 'professor')
+    if professor is None:
         return Response({'error': 'Professor not found'}, status=status.HTTP_404_NOT_FOUND)
     
+    prefetch_related_objects(
+        [professor], Prefetch('subjects', queryset=Subject.objects.select_related('faculty'))
+    )
+    if request.query_params.get('mode') == 'summary':
+        return _professor_dashboard_summary(request, professor)
+    
     subjects = professor.subjects.all()
     # Get all students enrolled in any of the professor's subjects
-    students = Student.objects.filter(subjects__in=subjects, is_active=True).distinct()
+    students = _professor_students(professor).with_related()
     students_count = students.count()
     
     data = {
@@ -275,11 +411,11 @@ def professor_dashboard(request):
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated, IsStudent])
+@conditional_get(Student, 'auth.User', Faculty, Subject, Student.subjects.through)
 def student_dashboard(request):
     """Get student dashboard data - Student only"""
-    try:
-        student = Student.objects.get(user=request.user)
-    except Student.DoesNotExist:
+    student = get_request_profile(request, 'student')
+    if student is None:
         return Response({'error': 'Student not found'}, status=status.HTTP_404_NOT_FOUND)
     
     enrolled_subjects = student.subjects.all()
@@ -294,42 +430,48 @@ def student_dashboard(request):
     return Response(serializer.data)
 
 
+def _course_catalog_response(profile):
+    """
+    All active courses with the profile's enrollment status, built from one
+    query: faculty is joined and `is_enrolled` is an EXISTS subquery on the
+    profile's subjects through table.
+    """
+    through = type(profile).subjects.through
+    owner_field = f'{type(profile)._meta.model_name}_id'
+    enrolled = through.objects.filter(subject_id=OuterRef('pk'), **{owner_field: profile.pk})
+    courses = (
+        Subject.objects.filter(is_active=True)
+        .select_related('faculty')
+        .annotate(is_enrolled=Exists(enrolled))
+    )
+    courses_data = CourseSerializer(courses, many=True).data
+    
+    return Response({
+        'courses': courses_data,
+        'total_courses': len(courses_data),
+        'enrolled_count': sum(1 for course in courses_data if course['is_enrolled'])
+    })
+
+
 @api_view(['GET'])
 @permission_classes([IsAuthenticated, IsStudent])
+@conditional_get(Subject, Faculty, Student.subjects.through)
 def student_courses(request):
     """Get all available courses for student - shows enrolled status"""
-    try:
-        student = Student.objects.get(user=request.user)
-    except Student.DoesNotExist:
+    student = get_request_profile(request, 'student')
+    if student is None:
         return Response({'error': 'Student not found'}, status=status.HTTP_404_NOT_FOUND)
     
-    # Get all active subjects
-    all_subjects = Subject.objects.filter(is_active=True)
-    
-    # Get enrolled subject IDs
-    enrolled_subject_ids = set(student.subjects.filter(is_active=True).values_list('id', flat=True))
-    
-    # Serialize subjects with enrollment status
-    courses_data = []
-    for subject in all_subjects:
-        subject_data = SubjectSerializer(subject).data
-        subject_data['is_enrolled'] = subject.id in enrolled_subject_ids
-        courses_data.append(subject_data)
-    
-    return Response({
-        'courses': courses_data,
-        'total_courses': len(courses_data),
-        'enrolled_count': len(enrolled_subject_ids)
-    })
+    return _course_catalog_response(student)
 
 
 @api_view(['POST'])
 @permission_classes([IsAuthenticated, IsStudent])
+@retry_on_lock
 def enroll_course(request, subject_id):
     """Enroll student in a course"""
-    try:
-        student = Student.objects.get(user=request.user)
-    except Student.DoesNotExist:
+    student = get_request_profile(request, 'student')
+    if student is None:
         return Response({'error': 'Student not found'}, status=status.HTTP_404_NOT_FOUND)
     
     try:
@@ -355,40 +497,23 @@ def enroll_course(request, subject_id):
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated, IsProfessor])
+@conditional_get(Subject, Faculty, Professor.subjects.through)
 def professor_courses(request):
     """Get all available courses for professor - shows enrolled status"""
-    try:
-        professor = Professor.objects.get(user=request.user)
-    except Professor.DoesNotExist:
+    professor = get_request_profile(request, 'professor')
+    if professor is None:
         return Response({'error': 'Professor not found'}, status=status.HTTP_404_NOT_FOUND)
     
-    # Get all active subjects
-    all_subjects = Subject.objects.filter(is_active=True)
-    
-    # Get enrolled subject IDs (subjects professor teaches)
-    enrolled_subject_ids = set(professor.subjects.filter(is_active=True).values_list('id', flat=True))
-    
-    # Serialize subjects with enrollment status
-    courses_data = []
-    for subject in all_subjects:
-        subject_data = SubjectSerializer(subject).data
-        subject_data['is_enrolled'] = subject.id in enrolled_subject_ids
-        courses_data.append(subject_data)
-    
-    return Response({
-        'courses': courses_data,
-        'total_courses': len(courses_data),
-        'enrolled_count': len(enrolled_subject_ids)
-    })
+    return _course_catalog_response(professor)
 
 
 @api_view(['POST'])
 @permission_classes([IsAuthenticated, IsProfessor])
+@retry_on_lock
 def enroll_professor_course(request, subject_id):
     """Enroll professor in a course (assign subject to professor)"""
-    try:
-        professor = Professor.objects.get(user=request.user)
-    except Professor.DoesNotExist:
+    professor = get_request_profile(request, 'professor')
+    if professor is None:
         return Response({'error': 'Professor not found'}, status=status.HTTP_404_NOT_FOUND)
     
     try:
@@ -414,11 +539,11 @@ def enroll_professor_course(request, subject_id):
 
 @api_view(['POST'])
 @permission_classes([IsAuthenticated, IsProfessor])
+@retry_on_lock
 def enroll_student(request, student_id, subject_id):
     """Enroll a student in a course that the professor teaches"""
-    try:
-        professor = Professor.objects.get(user=request.user)
-    except Professor.DoesNotExist:
+    professor = get_request_profile(request, 'professor')
+    if professor is None:
         return Response({'error': 'Professor not found'}, status=status.HTTP_404_NOT_FOUND)
     
     try:
@@ -451,43 +576,74 @@ def enroll_student(request, student_id, subject_id):
     }, status=status.HTTP_200_OK)
 
 
+@api_view(['POST'])
+@permission_classes([IsAuthenticated, IsAdminOrProfessor])
+@retry_on_lock
+def bulk_enroll_students(request):
+    """
+    Enroll many students in many subjects in one request.
+    Admins can enroll into any active subject, professors only into subjects they teach.
+    Body: {"enrollments": [{"student_id": 1, "subject_id": 2}, ...]}
+    """
+    items = request.data.get('enrollments') if isinstance(request.data, dict) else None
+    if not isinstance(items, list) or not items:
+        return Response({'error': 'Provide a non-empty "enrollments" list'}, status=status.HTTP_400_BAD_REQUEST)
+    if len(items) > settings.BULK_ENROLL_MAX_PAIRS:
+        return Response({'error': f'At most {settings.BULK_ENROLL_MAX_PAIRS} enrollments per request'},
+                        status=status.HTTP_400_BAD_REQUEST)
+    
+    professor = get_request_profile(request) if get_request_role(request) == 'professor' else None
+    results = bulk_enroll(items, professor=professor)
+    
+    return Response({
+        'enrolled': sum(1 for result in results if result['status'] == 'enrolled'),
+        'results': results
+    }, status=status.HTTP_200_OK)
+
+
 @api_view(['GET'])
 @permission_classes([IsAuthenticated, IsProfessor])
 def get_student_grades(request, student_id, subject_id=None):
     """Get grades for a student in professor's subjects"""
-    try:
-        professor = Professor.objects.get(user=request.user)
-    except Professor.DoesNotExist:
+    professor = get_request_profile(request, 'professor')
+    if professor is None:
         return Response({'error': 'Professor not found'}, status=status.HTTP_404_NOT_FOUND)
     
     try:
-        student = Student.objects.get(id=student_id, is_active=True)
+        student = Student.objects.with_related().get(id=student_id, is_active=True)
     except Student.DoesNotExist:
         return Response({'error': 'Student not found'}, status=status.HTTP_404_NOT_FOUND)
     
-    # Get professor's subjects
-    professor_subjects = professor.subjects.all()
+    # Professor's subjects, kept as a subquery so each check is a single query
+    professor_subjects = Professor.subjects.through.objects.filter(professor=professor)
     
     # Check if student is enrolled in any of professor's subjects
-    student_subjects = student.subjects.filter(id__in=professor_subjects.values_list('id', flat=True))
-    
-    if not student_subjects.exists():
+    enrolled = Student.subjects.through.objects.filter(
+        student_id=student.id, subject_id__in=professor_subjects.values('subject_id')
+    )
+    if not enrolled.exists():
         return Response({'error': 'Student is not enrolled in any of your subjects'}, status=status.HTTP_403_FORBIDDEN)
     
     # Get grades
+    grades = Grade.objects.filter(student=student, professor=professor).select_related(
+        'student__user', 'subject', 'professor__user'
+    )
     if subject_id:
         # Get grade for specific subject
-        try:
-            subject = Subject.objects.get(id=subject_id)
-            if subject not in professor_subjects:
-                return Response({'error': 'You do not teach this subject'}, status=status.HTTP_403_FORBIDDEN)
-            
-            grades = Grade.objects.filter(student=student, subject=subject, professor=professor)
-        except Subject.DoesNotExist:
+        subject = (
+            Subject.objects.filter(id=subject_id)
+            .annotate(taught=Exists(professor_subjects.filter(subject_id=OuterRef('pk'))))
+            .values('taught')
+            .first()
+        )
+        if subject is None:
             return Response({'error': 'Subject not found'}, status=status.HTTP_404_NOT_FOUND)
+        if not subject['taught']:
+            return Response({'error': 'You do not teach this subject'}, status=status.HTTP_403_FORBIDDEN)
+        grades = grades.filter(subject_id=subject_id)
     else:
         # Get all grades for student in professor's subjects
-        grades = Grade.objects.filter(student=student, subject__in=professor_subjects, professor=professor)
+        grades = grades.filter(subject_id__in=professor_subjects.values('subject_id'))
     
     serializer = GradeSerializer(grades, many=True)
     return Response({
@@ -496,13 +652,152 @@ def get_student_grades(request, student_id, subject_id=None):
     })
 
 
+GRADE_PLACES = Decimal('0.01')
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated, IsProfessor])
+def gradebook(request):
+    """
+    Grade matrix of enrolled students x the professor's subjects.
+    `students` are the rows and `subjects` the columns; `cells` lists every
+    enrollment as parallel `row`, `col` and `grade` arrays (grade is null
+    when not graded yet). Optional `?subject_id=` limits it to one subject.
+    """
+    professor = get_request_profile(request, 'professor')
+    if professor is None:
+        return Response({'error': 'Professor not found'}, status=status.HTTP_404_NOT_FOUND)
+    
+    subjects = professor.subjects.order_by('code')
+    subject_id = request.query_params.get('subject_id')
+    if subject_id is not None:
+        try:
+            subjects = subjects.filter(id=int(subject_id))
+        except ValueError:
+            return Response({'error': 'subject_id must be an integer'}, status=status.HTTP_400_BAD_REQUEST)
+    subjects = list(subjects.values('id', 'code', 'name'))
+    if subject_id is not None and not subjects:
+        return Response({'error': 'You do not teach this subject'}, status=status.HTTP_403_FORBIDDEN)
+    
+    # One pass over the enrollment table, with this professor's grade joined in
+    professor_grade = Grade.objects.filter(
+        student_id=OuterRef('student_id'), subject_id=OuterRef('subject_id'), professor=professor
+    ).order_by().values('grade')[:1]
+    enrollments = (
+        Student.subjects.through.objects
+        .filter(subject_id__in=[subject['id'] for subject in subjects], student__is_active=True)
+        .annotate(grade=Subquery(professor_grade))
+        .order_by('student__user__last_name', 'student__user__first_name', 'student_id')
+        .values_list(
+            'student_id', 'student__enrollment_number', 'student__user__first_name',
+            'student__user__last_name', 'subject_id', 'grade'
+        )
+    )
+    
+    # Subquery values aren't rounded to the field's decimal places on every backend
+    columns = {subject['id']: index for index, subject in enumerate(subjects)}
+    rows = {}
+    students = []
+    cells = {'row': [], 'col': [], 'grade': []}
+    for student_id, enrollment_number, first_name, last_name, enrolled_subject_id, grade in enrollments:
+        if student_id not in rows:
+            rows[student_id] = len(students)
+            students.append({
+                'id': student_id,
+                'enrollment_number': enrollment_number,
+                'name': f'{first_name} {last_name}'.strip(),
+            })
+        cells['row'].append(rows[student_id])
+        cells['col'].append(columns[enrolled_subject_id])
+        cells['grade'].append(None if grade is None else str(grade.quantize(GRADE_PLACES)))
+    
+    return Response({'subjects': subjects, 'students': students, 'cells': cells})
+
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated, IsProfessor])
+def import_grades_view(request):
+    """
+    Bulk create/update grades from an uploaded CSV or JSON Lines file.
+    Multipart field `file`; columns student_id, subject_id, grade, notes.
+    The format comes from the file name or `?file_format=csv|jsonl`.
+    """
+    professor = get_request_profile(request, 'professor')
+    if professor is None:
+        return Response({'error': 'Professor not found'}, status=status.HTTP_404_NOT_FOUND)
+    
+    upload = request.FILES.get('file')
+    if upload is None:
+        return Response({'error': 'Upload the grades in a "file" field'}, status=status.HTTP_400_BAD_REQUEST)
+    
+    file_format = request.query_params.get('file_format') or detect_format(upload.name)
+    try:
+        report = import_grades(professor, iter_file_lines(upload), file_format=file_format)
+    except ValueError as e:
+        # Unsupported format; unreadable content is reported per line in the 200 report
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    
+    return Response(report, status=status.HTTP_200_OK)
+
+
+def _export_response(request, rows_for, columns, name):
+    """
+    Stream an export as CSV or JSON Lines (`?file_format=`, default csv).
+    Admins export every subject, professors only the subjects they teach
+    (and, for grades, only the grades they gave); `?subject_id=` narrows the
+    export to one subject.
+    """
+    file_format = request.query_params.get('file_format', 'csv')
+    if file_format not in exports.FORMATS:
+        return Response({'error': 'file_format must be csv or jsonl'}, status=status.HTTP_400_BAD_REQUEST)
+    
+    subject_ids = None
+    professor = None
+    if get_request_role(request) == 'professor':
+        professor = get_request_profile(request)
+        if professor is None:
+            return Response({'error': 'Professor not found'}, status=status.HTTP_404_NOT_FOUND)
+        subject_ids = set(professor.subjects.values_list('id', flat=True))
+    
+    subject_id = request.query_params.get('subject_id')
+    if subject_id is not None:
+        try:
+            subject_id = int(subject_id)
+        except ValueError:
+            return Response({'error': 'subject_id must be an integer'}, status=status.HTTP_400_BAD_REQUEST)
+        if subject_ids is not None and subject_id not in subject_ids:
+            return Response({'error': 'You do not teach this subject'}, status=status.HTTP_403_FORBIDDEN)
+        subject_ids = {subject_id}
+    
+    response = StreamingHttpResponse(
+        exports.stream_export(rows_for(subject_ids, professor), columns, file_format),
+        content_type=exports.CONTENT_TYPES[file_format]
+    )
+    response['Content-Disposition'] = f'attachment; filename="{name}.{file_format}"'
+    return response
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated, IsAdminOrProfessor])
+def export_grades(request):
+    """Stream grades joined with student, subject and professor names"""
+    return _export_response(request, exports.grade_rows, exports.GRADE_COLUMNS, 'grades')
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated, IsAdminOrProfessor])
+def export_roster(request):
+    """Stream the students enrolled in each subject"""
+    return _export_response(request, exports.roster_rows, exports.ROSTER_COLUMNS, 'roster')
+
+
 @api_view(['POST', 'PUT'])
 @permission_classes([IsAuthenticated, IsProfessor])
+@retry_on_lock
 def grade_student(request, student_id, subject_id):
     """Create or update a grade for a student in a subject"""
-    try:
-        professor = Professor.objects.get(user=request.user)
-    except Professor.DoesNotExist:
+    professor = get_request_profile(request, 'professor')
+    if professor is None:
         return Response({'error': 'Professor not found'}, status=status.HTTP_404_NOT_FOUND)
     
     try:
@@ -544,31 +839,41 @@ def grade_student(request, student_id, subject_id):
     }, status=status.HTTP_200_OK)
 
 
-class FacultyViewSet(viewsets.ModelViewSet):
+class FacultyViewSet(ConditionalGetMixin, CachedResponseMixin, viewsets.ModelViewSet):
+    cache_models = ('university.Faculty',)
+    condition_sources = (Faculty,)
     queryset = Faculty.objects.all()
     serializer_class = FacultySerializer
     permission_classes = [IsAuthenticated]
 
 
-class SubjectViewSet(viewsets.ModelViewSet):
-    queryset = Subject.objects.all()
+class SubjectViewSet(ConditionalGetMixin, CachedResponseMixin, viewsets.ModelViewSet):
+    # faculty_name comes from the faculty row
+    cache_models = ('university.Subject', 'university.Faculty')
+    condition_sources = (Subject, Faculty)
+    queryset = Subject.objects.select_related('faculty')
     serializer_class = SubjectSerializer
     permission_classes = [IsAuthenticated]
 
 
-class AdministratorViewSet(viewsets.ModelViewSet):
-    queryset = Administrator.objects.all()
+class AdministratorViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
+    condition_sources = (Administrator, 'auth.User')
+    queryset = Administrator.objects.select_related('user')
     serializer_class = AdministratorSerializer
     permission_classes = [IsAuthenticated, IsAdmin]
 
 
-class ProfessorViewSet(viewsets.ModelViewSet):
-    queryset = Professor.objects.all()
+class ProfessorViewSet(ConditionalGetMixin, ValuesListMixin, viewsets.ModelViewSet):
+    condition_sources = (Professor, 'auth.User', Faculty, Subject, Professor.subjects.through)
+    values_serializer_class = ProfessorValuesSerializer
+    queryset = Professor.objects.with_related()
     serializer_class = ProfessorSerializer
     permission_classes = [IsAuthenticated]
 
 
-class StudentViewSet(viewsets.ModelViewSet):
-    queryset = Student.objects.all()
+class StudentViewSet(ConditionalGetMixin, ValuesListMixin, viewsets.ModelViewSet):
+    condition_sources = (Student, 'auth.User', Faculty, Subject, Student.subjects.through)
+    values_serializer_class = StudentValuesSerializer
+    queryset = Student.objects.with_related()
     serializer_class = StudentSerializer
     permission_classes = [IsAuthenticated]
@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+from importlib.util import find_spec
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -46,8 +47,23 @@ INSTALLED_APPS = [
 # JWT Configuration
 JWT_SECRET_KEY = 'your-secret-key-change-in-production-django-insecure-jwt-university'
 JWT_ALGORITHM = 'HS256'
+# Optional asymmetric signing keys (RS256/EdDSA, needs the `cryptography` package).
+# Keys are listed by kid: {'<kid>': {'algorithm': 'RS256', 'private_key': PEM, 'public_key': PEM}}.
+# JWT_ACTIVE_KID signs new tokens; every listed key still verifies, which allows rotation.
+# Public keys are published at /api/jwks/. With no active kid, tokens use JWT_SECRET_KEY.
+JWT_SIGNING_KEYS = {}
+JWT_ACTIVE_KID = None
+JWT_VERIFIED_TOKEN_CACHE_SIZE = 4096  # 0 disables the verified-token cache
+JWT_REVOCATION_REFRESH_SECONDS = 5  # How often workers pull new access-token revocations
 JWT_EXPIRATION_DELTA_MINUTES = 15
 JWT_REFRESH_EXPIRATION_DELTA_DAYS = 1  # Changed to 1 day as per requirements
+JWT_REFRESH_TOKENS_PER_USER = 5  # Oldest live tokens are evicted beyond this
+JWT_REFRESH_ROTATION_GRACE_SECONDS = 30  # Rotated tokens stay valid briefly for concurrent renews
+
+# Per-process cache of authenticated users and their roles
+JWT_USER_CACHE_ENABLED = True
+JWT_USER_CACHE_SIZE = 1024
+JWT_USER_CACHE_TTL_SECONDS = 60
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
@@ -58,6 +74,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'university.middleware.ReplicaRoutingMiddleware',
 ]
 
 ROOT_URLCONF = 'university_project.urls'
@@ -87,9 +104,90 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # Keep connections open between requests, checking them before reuse
+        'CONN_MAX_AGE': 600,
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {
+            # Take the write lock when a transaction starts instead of failing to upgrade later
+            'transaction_mode': 'IMMEDIATE',
+            'timeout': 5,
+        },
     }
 }
 
+# Applied to every new SQLite connection (university.database.configure_sqlite).
+# WAL lets readers run alongside the single writer; NORMAL sync is safe in WAL mode.
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'busy_timeout': 5000,           # milliseconds
+    'mmap_size': 128 * 1024 * 1024,  # bytes
+    'cache_size': -20000,           # negative = KiB, about 20 MB per connection
+}
+
+# Read replica
+# Add a second alias to DATABASES (e.g. another SQLite file refreshed with
+# `python manage.py sync_replica`) and name it here to serve heavy GET views
+# from it. Give the replica alias 'TEST': {'MIRROR': 'default'} so tests share
+# one database. Leave as None to read everything from the primary.
+DATABASE_ROUTERS = ['university.routers.ReplicaRouter']
+READ_REPLICA_ALIAS = None
+# URL names whose GET requests may be served from the replica
+READ_REPLICA_URL_NAMES = {
+    'admin_dashboard', 'professor_dashboard', 'student_dashboard',
+    'student_courses', 'professor_courses', 'gradebook',
+    'faculty-list', 'faculty-detail', 'subject-list', 'subject-detail',
+    'administrator-list', 'administrator-detail', 'professor-list', 'professor-detail',
+    'student-list', 'student-detail',
+}
+# After a write, the client reads from the primary for this long
+READ_REPLICA_PIN_COOKIE = 'primaryPin'
+READ_REPLICA_PIN_SECONDS = 15
+
+# Caches
+# `responses` holds the versioned FacultyViewSet/SubjectViewSet responses and the
+# model version counters behind them and the conditional GET validators. It must
+# be shared by every worker process and by the management commands
+# (warm_response_cache), so a change seen by one process invalidates what the
+# others cached: files on local disk work for a single host; use Redis or
+# Memcached across hosts. Per-process backends (local memory) are not supported.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'responses': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': BASE_DIR / '.cache' / 'responses',
+        'OPTIONS': {'MAX_ENTRIES': 5000},
+    },
+}
+RESPONSE_CACHE_ENABLED = True
+RESPONSE_CACHE_ALIAS = 'responses'
+RESPONSE_CACHE_TIMEOUT = 300  # seconds; changes invalidate entries immediately anyway
+RESPONSE_CACHE_STATS_FLUSH_EVERY = 100  # lookups counted in-process before the shared hit/miss counters are updated
+
+# Bounded retry for write views that still hit "database is locked"
+DB_LOCK_RETRY_ATTEMPTS = 5
+DB_LOCK_RETRY_BASE_DELAY = 0.05  # seconds, doubled per attempt
+DB_LOCK_RETRY_MAX_DELAY = 1.0
+
+
+# Maximum (student, subject) pairs accepted by one bulk enrollment request
+BULK_ENROLL_MAX_PAIRS = 10000
+
+# Password hashing
+# PBKDF2 work factor is tunable; stored hashes are upgraded on the next login.
+PASSWORD_HASHERS = [
+    'university.passwords.TunablePBKDF2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+    'django.contrib.auth.hashers.Argon2PasswordHasher',
+    'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
+    'django.contrib.auth.hashers.ScryptPasswordHasher',
+]
+PASSWORD_HASH_ITERATIONS = 1_000_000
+
+# Process pool used by the async login endpoint for password verification
+LOGIN_HASH_WORKERS = 2
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -167,4 +265,23 @@ REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
+    'DEFAULT_PAGINATION_CLASS': 'university.pagination.CreatedAtCursorPagination',
+    'PAGE_SIZE': 100,
+    # Compact JSON, encoded with orjson when it is installed (same bytes as DRF's JSONRenderer)
+    'DEFAULT_RENDERER_CLASSES': [
+        'university.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'rest_framework.parsers.JSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
 }
+
+# MessagePack responses (`Accept: application/msgpack`) and request bodies,
+# offered only when the optional msgpack package is installed
+MSGPACK_ENABLED = find_spec('msgpack') is not None
+if MSGPACK_ENABLED:
+    REST_FRAMEWORK['DEFAULT_RENDERER_CLASSES'].append('university.renderers.MessagePackRenderer')
+    REST_FRAMEWORK['DEFAULT_PARSER_CLASSES'].append('university.renderers.MessagePackParser')